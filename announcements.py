@@ -0,0 +1,82 @@
+"""Spoken announcements of the 90 numbers: their texts in each language and
+the manifest of clips pre-rendered by build_audio.py.
+
+Kept apart from app.py so the build step can import it without opening the
+database or starting the app's threads.
+"""
+import json
+import os
+
+NUMBERS = range(1, 91)
+
+# Spoken forms of the 90 numbers, built once: NUMBER_TEXTS[language][number]
+ENGLISH_UNITS = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+                 "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen",
+                 "Seventeen", "Eighteen", "Nineteen"]
+ENGLISH_TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+def english_number_text(number):
+    if number < 20:
+        return ENGLISH_UNITS[number]
+    tens, units = divmod(number, 10)
+    return ENGLISH_TENS[tens] + (f"-{ENGLISH_UNITS[units]}" if units else "")
+
+HINDI_NUMBERS = """
+    एक दो तीन चार पाँच छह सात आठ नौ दस
+    ग्यारह बारह तेरह चौदह पंद्रह सोलह सत्रह अठारह उन्नीस बीस
+    इक्कीस बाईस तेईस चौबीस पच्चीस छब्बीस सत्ताईस अट्ठाईस उनतीस तीस
+    इकतीस बत्तीस तैंतीस चौंतीस पैंतीस छत्तीस सैंतीस अड़तीस उनतालीस चालीस
+    इकतालीस बयालीस तैंतालीस चवालीस पैंतालीस छियालीस सैंतालीस अड़तालीस उनचास पचास
+    इक्यावन बावन तिरपन चौवन पचपन छप्पन सत्तावन अट्ठावन उनसठ साठ
+    इकसठ बासठ तिरसठ चौंसठ पैंसठ छियासठ सड़सठ अड़सठ उनहत्तर सत्तर
+    इकहत्तर बहत्तर तिहत्तर चौहत्तर पचहत्तर छिहत्तर सतहत्तर अठहत्तर उन्यासी अस्सी
+    इक्यासी बयासी तिरासी चौरासी पचासी छियासी सत्तासी अट्ठासी नवासी नब्बे
+""".split()
+
+NUMBER_TEXTS = {
+    'en': {number: english_number_text(number) for number in NUMBERS},
+    'hi': dict(zip(NUMBERS, HINDI_NUMBERS)),
+}
+
+# Traditional housie calls
+HOUSIE_CALLS = dict(zip(NUMBERS, [
+    "Kelly's Eye", "One Little Duck", "Cup of Tea", "Knock at the Door", "Man Alive",
+    "Half a Dozen", "Lucky Seven", "Garden Gate", "Doctor's Orders", "Cock and Hen",
+    "Legs Eleven", "One Dozen", "Unlucky for Some", "Valentine's Day", "Young and Keen",
+    "Sweet Sixteen", "Dancing Queen", "Coming of Age", "Goodbye Teens", "One Score",
+    "Key of the Door", "Two Little Ducks", "Thee and Me", "Two Dozen", "Duck and Dive",
+    "Pick and Mix", "Gateway to Heaven", "In a State", "Rise and Shine", "Dirty Gertie",
+    "Get Up and Run", "Buckle My Shoe", "All the Threes", "Ask for More", "Jump and Jive",
+    "Three Dozen", "More than Eleven", "Christmas Cake", "Thirty-Nine Steps", "Naughty Forty",
+    "Time for Fun", "Winnie the Pooh", "Down on Your Knees", "Droopy Drawers", "Halfway There",
+    "Up to Tricks", "Four and Seven", "Four Dozen", "P.C.", "Half a Century",
+    "Tweak of the Thumb", "Danny La Rue", "Stuck in the Tree", "Clean the Floor", "Snakes Alive",
+    "Was She Worth It", "Heinz Varieties", "Make Them Wait", "Brighton Line", "Five Dozen",
+    "Baker's Bun", "Tickety-Boo", "Tickle Me", "Red Raw", "Old Age Pension",
+    "Clickety Click", "Stairway to Heaven", "Saving Grace", "Either Way Up", "Three Score and Ten",
+    "Bang on the Drum", "Six Dozen", "Queen Bee", "Candy Store", "Strive and Strive",
+    "Trombones", "Sunset Strip", "Heaven's Gate", "One More Time", "Eight and Blank",
+    "Stop and Run", "Straight on Through", "Time for Tea", "Seven Dozen", "Staying Alive",
+    "Between the Sticks", "Torquay in Devon", "Two Fat Ladies", "Nearly There", "Top of the Shop",
+]))
+
+def get_number_text(number, language='en'):
+    """Spoken form of a number, e.g. 23 -> 'Twenty-Three'"""
+    if not number:
+        return ""
+    return NUMBER_TEXTS[language].get(number, str(number))
+
+def announcement_text(number, language='en'):
+    """What a caller says for a number, e.g. 'Number 23 - Twenty-Three'"""
+    return f"Number {number} - {get_number_text(number, language)}"
+
+# Announcements pre-rendered by build_audio.py; file names carry a content hash
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'audio')
+
+def load_audio_manifest():
+    """{voice: {'language', 'files': {number: path}}}, or {} before the first build"""
+    try:
+        with open(os.path.join(AUDIO_DIR, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
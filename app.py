@@ -4,23 +4,34 @@ import uuid
 import random
 import json
 import qrcode
+import qrcode.image.svg
 import io
-import base64
+import hashlib
 import secrets
 import string
+import math
+import functools
+import itertools
 from datetime import datetime
-from flask import Flask, render_template, request, session, redirect, url_for
+from flask import Flask, render_template, request, session, redirect, url_for, g, has_app_context, abort, make_response
 from flask import send_from_directory
 from flask import jsonify
 import time
 import threading
+import collections
+import bisect
+import csv
+import struct
+import zlib
+from array import array
 from flask import Response
+from announcements import (AUDIO_DIR, HOUSIE_CALLS, NUMBER_TEXTS, announcement_text, get_number_text,
+                           load_audio_manifest)
 
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-key-123')
-auto_call_enabled = False
-auto_call_interval = 10  # seconds
+DEFAULT_GAME_ID = 1  # the room served at the unprefixed URLs
 
 # Database setup for Render
 def get_db_path():
@@ -28,16 +39,40 @@ def get_db_path():
 
 def init_db():
     conn = sqlite3.connect(get_db_path())
+    # WAL lets players keep reading while the auto-caller writes; the
+    # setting is stored in the database file
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.row_factory = sqlite3.Row
     c = conn.cursor()
     
     # Create all tables
     tables = [
+        '''CREATE TABLE IF NOT EXISTS games
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            users_count INTEGER NOT NULL DEFAULT 0,
+            tickets_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
+
         '''CREATE TABLE IF NOT EXISTS users
            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL DEFAULT 1,
             name TEXT NOT NULL,
-            device_id TEXT UNIQUE NOT NULL,
+            device_id TEXT NOT NULL,
             ticket_code TEXT UNIQUE NOT NULL,
-            ticket_data TEXT,
+            ticket_data BLOB,
+            numbers_count INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (game_id, device_id))''',
+
+        '''CREATE TABLE IF NOT EXISTS tickets
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL DEFAULT 1,
+            user_id INTEGER NOT NULL,
+            ticket_code TEXT UNIQUE NOT NULL,
+            ticket_data BLOB NOT NULL,
+            strip_position INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''',
             
         '''CREATE TABLE IF NOT EXISTS used_tickets
@@ -47,6 +82,7 @@ def init_db():
             
         '''CREATE TABLE IF NOT EXISTS prizes
            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL DEFAULT 1,
             user_id INTEGER,
             ticket_code TEXT,
             user_name TEXT,
@@ -54,13 +90,31 @@ def init_db():
             status TEXT DEFAULT 'pending',
             claimed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             approved_at TIMESTAMP NULL,
-            approved_by TEXT NULL)''',
+            approved_by TEXT NULL,
+            completed_call INTEGER,
+            review_reason TEXT,
+            claimed_call INTEGER)''',
             
         '''CREATE TABLE IF NOT EXISTS called_numbers
            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL DEFAULT 1,
             number INTEGER NOT NULL,
             called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            called_by TEXT DEFAULT 'system')'''
+            called_by TEXT DEFAULT 'system')''',
+
+        '''CREATE TABLE IF NOT EXISTS auto_call
+           (game_id INTEGER PRIMARY KEY,
+            enabled INTEGER NOT NULL DEFAULT 0,
+            interval REAL NOT NULL DEFAULT 10,
+            owner TEXT,
+            lease_until REAL NOT NULL DEFAULT 0)''',
+
+        '''CREATE TABLE IF NOT EXISTS events
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL DEFAULT 1,
+            event TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
     ]
     
     for table_sql in tables:
@@ -70,250 +124,740 @@ def init_db():
             print(f"Error creating table: {e}")
     
     conn.commit()
+    migrate_db(conn)
     conn.close()
     
     # Initialize prizes table with some data if empty
     initialize_prizes_table()
 
-def get_db():
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    return conn
+# Schema migrations, applied in order; PRAGMA user_version records the
+# last one a database has seen
+def add_numbers_count_column(conn):
+    try:
+        conn.execute('ALTER TABLE users ADD COLUMN numbers_count INTEGER')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+def migrate_ticket_fingerprints(conn):
+    """Replace process-specific hash() keys in used_tickets with fingerprints"""
+    stale = conn.execute('SELECT COUNT(*) FROM used_tickets WHERE length(ticket_hash) != 32').fetchone()[0]
+    if not stale:
+        return
+    conn.execute('DELETE FROM used_tickets WHERE length(ticket_hash) != 32')
+    for (ticket_data,) in conn.execute('SELECT ticket_data FROM users').fetchall():
+        try:
+            conn.execute('INSERT INTO used_tickets (ticket_hash) VALUES (?) ON CONFLICT(ticket_hash) DO NOTHING',
+                         [ticket_fingerprint(json.loads(ticket_data))])
+        except (TypeError, ValueError):
+            continue
+    print(f"Migrated {stale} used_tickets rows to stable fingerprints")
+
+def add_query_indexes(conn):
+    """Indexes behind the claim, winner and admin queries"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_prizes_type_status ON prizes (prize_type, status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_prizes_user_type_status ON prizes (user_id, prize_type, status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_prizes_status_approved ON prizes (status, approved_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_prizes_status_claimed ON prizes (status, claimed_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at)')
+
+def add_prize_uniqueness(conn):
+    """Partial unique indexes: one approved winner per prize, one active claim per user and prize"""
+    # Demote duplicates that the old check-then-write code let through,
+    # keeping the earliest row of each group
+    demoted = conn.execute('''
+        UPDATE prizes SET status = 'rejected'
+        WHERE status = 'approved' AND id NOT IN
+            (SELECT MIN(id) FROM prizes WHERE status = 'approved' GROUP BY prize_type)
+    ''').rowcount
+    demoted += conn.execute('''
+        UPDATE prizes SET status = 'rejected'
+        WHERE status IN ('pending', 'approved') AND id NOT IN
+            (SELECT MIN(id) FROM prizes WHERE status IN ('pending', 'approved') GROUP BY user_id, prize_type)
+    ''').rowcount
+    if demoted:
+        print(f"Rejected {demoted} duplicate prize claims")
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_prizes_one_winner
+                    ON prizes (prize_type) WHERE status = 'approved' ''')
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_prizes_one_active_claim
+                    ON prizes (user_id, prize_type) WHERE status IN ('pending', 'approved')''')
+
+def add_claim_review_columns(conn):
+    """Call index at which a claimed pattern completed, and why a claim needs review"""
+    for column in ('completed_call INTEGER', 'review_reason TEXT'):
+        try:
+            conn.execute(f'ALTER TABLE prizes ADD COLUMN {column}')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    # Pending claims are reviewed in completion order
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_prizes_status_completed '
+                 'ON prizes (status, completed_call, claimed_at)')
+
+GAME_INDEXES = {
+    'idx_prizes_one_winner': '''CREATE UNIQUE INDEX idx_prizes_one_winner
+                                ON prizes (game_id, prize_type) WHERE status = 'approved' ''',
+    'idx_prizes_type_status': 'CREATE INDEX idx_prizes_type_status ON prizes (game_id, prize_type, status)',
+    'idx_prizes_status_approved': 'CREATE INDEX idx_prizes_status_approved ON prizes (game_id, status, approved_at)',
+    'idx_prizes_status_claimed': 'CREATE INDEX idx_prizes_status_claimed ON prizes (game_id, status, claimed_at)',
+    'idx_prizes_status_completed': 'CREATE INDEX idx_prizes_status_completed '
+                                   'ON prizes (game_id, status, completed_call, claimed_at)',
+    'idx_users_created': 'CREATE INDEX idx_users_created ON users (game_id, created_at)',
+    'idx_users_game': 'CREATE INDEX idx_users_game ON users (game_id)',
+    'idx_prizes_game_status': 'CREATE INDEX idx_prizes_game_status ON prizes (game_id, status)',
+    'idx_called_numbers_game': 'CREATE INDEX idx_called_numbers_game ON called_numbers (game_id)',
+    'idx_events_game': 'CREATE INDEX idx_events_game ON events (game_id)',
+}
+
+def add_games(conn):
+    """Games table, with every game's rows keyed by game_id; existing rows join the default game"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS games
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     name TEXT NOT NULL,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    conn.execute('INSERT OR IGNORE INTO games (id, name) VALUES (?, ?)', [DEFAULT_GAME_ID, 'Main Room'])
+    for table in ('prizes', 'called_numbers', 'events'):
+        try:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN game_id INTEGER NOT NULL DEFAULT {DEFAULT_GAME_ID}')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    # device_id becomes unique per game rather than globally, which SQLite
+    # can only change by rebuilding the table
+    if 'game_id' not in [row[1] for row in conn.execute('PRAGMA table_info(users)')]:
+        conn.execute('''CREATE TABLE users_new
+                        (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                         game_id INTEGER NOT NULL DEFAULT 1,
+                         name TEXT NOT NULL,
+                         device_id TEXT NOT NULL,
+                         ticket_code TEXT UNIQUE NOT NULL,
+                         ticket_data TEXT,
+                         numbers_count INTEGER,
+                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                         UNIQUE (game_id, device_id))''')
+        conn.execute('''INSERT INTO users_new (id, name, device_id, ticket_code, ticket_data, numbers_count, created_at)
+                        SELECT id, name, device_id, ticket_code, ticket_data, numbers_count, created_at FROM users''')
+        conn.execute('DROP TABLE users')
+        conn.execute('ALTER TABLE users_new RENAME TO users')
+
+    # Lead every game-scoped index with game_id
+    for name, sql in GAME_INDEXES.items():
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+        conn.execute(sql)
+
+def add_tickets_table(conn):
+    """Tickets table, so a player can hold several tickets; each user's ticket is copied in"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS tickets
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     game_id INTEGER NOT NULL DEFAULT 1,
+                     user_id INTEGER NOT NULL,
+                     ticket_code TEXT UNIQUE NOT NULL,
+                     ticket_data TEXT NOT NULL,
+                     strip_position INTEGER,
+                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    conn.execute('''INSERT INTO tickets (game_id, user_id, ticket_code, ticket_data, created_at)
+                    SELECT game_id, id, ticket_code, ticket_data, created_at FROM users
+                    WHERE ticket_data IS NOT NULL AND id NOT IN (SELECT user_id FROM tickets)
+                    ORDER BY id''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets (user_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tickets_game ON tickets (game_id)')
+
+def add_auto_call_table(conn):
+    """Auto-call settings shared by every worker, with the lease of the one that calls"""
+    conn.execute('''CREATE TABLE IF NOT EXISTS auto_call
+                    (game_id INTEGER PRIMARY KEY,
+                     enabled INTEGER NOT NULL DEFAULT 0,
+                     interval REAL NOT NULL DEFAULT 10,
+                     owner TEXT,
+                     lease_until REAL NOT NULL DEFAULT 0)''')
+
+def add_game_version(conn):
+    """Counter bumped by every change to a game's calls or winners"""
+    try:
+        conn.execute('ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+def add_claimed_call(conn):
+    """Numbers called when a claim was made, to spot claims made after the completing number"""
+    try:
+        conn.execute('ALTER TABLE prizes ADD COLUMN claimed_call INTEGER')
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+def add_game_counters(conn):
+    """Player and ticket counts per game, kept current by triggers"""
+    for column in ('users_count', 'tickets_count'):
+        try:
+            conn.execute(f'ALTER TABLE games ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    for table in ('users', 'tickets'):
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table}
+                         BEGIN UPDATE games SET {table}_count = {table}_count + 1 WHERE id = NEW.game_id; END''')
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table}
+                         BEGIN UPDATE games SET {table}_count = {table}_count - 1 WHERE id = OLD.game_id; END''')
+        conn.execute(f'UPDATE games SET {table}_count = (SELECT COUNT(*) FROM {table} WHERE game_id = games.id)')
 
-def generate_ticket_code():
+def add_users_search(conn):
+    """Keyset indexes for the admin lists and an FTS5 index of player names"""
+    for name in ('idx_users_game', 'idx_prizes_game_status'):
+        conn.execute(GAME_INDEXES[name].replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS'))
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(name, content='users', content_rowid='id')")
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 unavailable, name search falls back to LIKE: {e}")
+        return
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users
+                    BEGIN INSERT INTO users_fts (rowid, name) VALUES (NEW.id, NEW.name); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users
+                    BEGIN INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name); END''')
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name ON users
+                    BEGIN
+                        INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+                        INSERT INTO users_fts (rowid, name) VALUES (NEW.id, NEW.name);
+                    END''')
+    conn.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+
+def compact_ticket_data(conn):
+    """Rewrite JSON ticket_data as the 15-byte encode_ticket() BLOB"""
+    for table in ('users', 'tickets'):
+        last_id = 0
+        while True:
+            rows = conn.execute(f"""SELECT id, ticket_data FROM {table}
+                                    WHERE id > ? AND typeof(ticket_data) = 'text' ORDER BY id LIMIT 10000""",
+                                [last_id]).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for row_id, ticket_data in rows:
+                try:
+                    updates.append((encode_ticket(json.loads(ticket_data)), row_id))
+                except (TypeError, ValueError):
+                    continue  # not a standard ticket; stays JSON, which load_ticket still reads
+            conn.executemany(f'UPDATE {table} SET ticket_data = ? WHERE id = ?', updates)
+
+SCHEMA_MIGRATIONS = [
+    add_numbers_count_column,
+    migrate_ticket_fingerprints,
+    add_query_indexes,
+    add_prize_uniqueness,
+    add_claim_review_columns,
+    add_games,
+    add_tickets_table,
+    add_auto_call_table,
+    add_game_version,
+    add_game_counters,
+    add_users_search,
+    compact_ticket_data,
+    add_claimed_call,
+]
+
+def migrate_db(conn):
+    """Apply migrations newer than the database's user_version"""
+    # BEGIN IMMEDIATE so workers starting together migrate one at a time
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target, migration in enumerate(SCHEMA_MIGRATIONS, start=1):
+            if version < target:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+# Connection pooling: one connection per request, reused across requests
+DB_POOL_SIZE = 8
+DB_PRAGMAS = (
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA synchronous = NORMAL',  # safe with WAL; only the last commit can be lost on power failure
+    'PRAGMA mmap_size = 67108864',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -8000',
+)
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection shared by reference count; the last close() returns it to the pool"""
+
+    def close(self):
+        self.refs -= 1
+        if self.refs <= 0:
+            self.pool.release(self)
+
+class ConnectionPool:
+    """Small per-process pool of preconfigured connections"""
+
+    def __init__(self, size=DB_POOL_SIZE):
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+
+    def connect(self):
+        conn = sqlite3.connect(get_db_path(), factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked worker: never share the parent's connections
+                self.idle = []
+                self.pid = os.getpid()
+            conn = self.idle.pop() if self.idle else None
+        if conn is None:
+            conn = self.connect()
+        conn.refs = 1
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self.lock:
+            if self.pid == os.getpid() and len(self.idle) < self.size:
+                self.idle.append(conn)
+                return
+        sqlite3.Connection.close(conn)
+
+db_pool = ConnectionPool()
+
+def get_db(db=None):
+    """Return a connection; callers close() it when done.
+
+    Passing an existing connection shares it instead of opening another.
+    Inside a request every call shares the request's connection, which goes
+    back to the pool in teardown_appcontext.
+    """
+    if db is None and has_app_context():
+        db = g.get('db')
+        if db is None:
+            db = g.db = db_pool.acquire()
+    if db is None:
+        return db_pool.acquire()
+    db.refs += 1
+    return db
+
+@app.teardown_appcontext
+def release_db(exception):
+    db = g.pop('db', None)
+    if db is not None:
+        db.refs = 0
+        db.pool.release(db)
+
+# Push channel for called numbers and prize approvals
+EVENT_BUFFER_SIZE = 500       # events kept in memory for Last-Event-ID resume
+EVENT_SYNC_INTERVAL = 1       # seconds between checks for other workers' events
+EVENT_HEARTBEAT = 15          # seconds between keep-alive comments
+EVENT_STREAM_LIFETIME = 300   # seconds before a stream is recycled
+EVENT_RETRY_MS = 3000         # client reconnect delay
+
+def record_event(db, game_id, event, data):
+    """Queue a game event in the caller's transaction; call the game's events.sync() after commit"""
+    cursor = db.execute('INSERT INTO events (game_id, event, data) VALUES (?, ?, ?)',
+                        [game_id, event, json.dumps(data)])
+    return cursor.lastrowid
+
+class EventBroker:
+    """Fans one game's events out to its /events subscribers.
+
+    Events live in the events table so every gunicorn worker sees them.
+    Each process keeps a short in-memory tail and refreshes it from the
+    table at most once per EVENT_SYNC_INTERVAL, however many clients wait.
+    """
+
+    def __init__(self, game_id, buffer_size=EVENT_BUFFER_SIZE):
+        self.game_id = game_id
+        self.recent = collections.deque(maxlen=buffer_size)
+        self.floor_id = 0  # every event after this id is in recent
+        self.last_id = 0
+        self.last_sync = 0.0
+        self.condition = threading.Condition()
+        self.sync_lock = threading.Lock()
+
+    def sync(self, force=False):
+        """Pull events written by any process since the last sync"""
+        with self.sync_lock:
+            now = time.monotonic()
+            if not force and now - self.last_sync < EVENT_SYNC_INTERVAL:
+                return
+            self.last_sync = now
+            try:
+                db = get_db()
+                rows = db.execute(
+                    'SELECT id, event, data FROM events WHERE game_id = ? AND id > ? ORDER BY id ASC',
+                    [self.game_id, self.last_id]
+                ).fetchall()
+                db.close()
+            except sqlite3.Error as e:
+                print(f"Event sync error: {e}")
+                return
+            if not rows:
+                return
+            with self.condition:
+                for row in rows:
+                    if len(self.recent) == self.recent.maxlen:
+                        self.floor_id = self.recent[0][0]
+                    self.recent.append((row['id'], row['event'], row['data']))
+                    self.last_id = row['id']
+                self.condition.notify_all()
+
+    def events_since(self, last_id):
+        """Events newer than last_id, from memory or from the table if they have scrolled out"""
+        with self.condition:
+            if last_id >= self.floor_id:
+                return [e for e in self.recent if e[0] > last_id]
+        db = get_db()
+        rows = db.execute(
+            'SELECT id, event, data FROM events WHERE game_id = ? AND id > ? ORDER BY id ASC LIMIT ?',
+            [self.game_id, last_id, EVENT_BUFFER_SIZE]
+        ).fetchall()
+        db.close()
+        return [(row['id'], row['event'], row['data']) for row in rows]
+
+    def wait(self, last_id, timeout):
+        """Block until there are events newer than last_id or timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.condition:
+                if self.last_id > last_id:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self.condition.wait(min(remaining, EVENT_SYNC_INTERVAL))
+            self.sync()
+        return self.events_since(last_id)
+
+def generate_ticket_code(db=None):
     """Generate a unique 6-character ticket code"""
+    return generate_ticket_codes(1, db)[0]
+
+def generate_ticket_codes(count, db=None):
+    """Generate `count` distinct unused ticket codes, with one lookup query per round"""
     characters = string.ascii_uppercase + string.digits
-    while True:
-        code = ''.join(secrets.choice(characters) for _ in range(6))
-        db = get_db()
-        existing = db.execute('SELECT * FROM users WHERE ticket_code = ?', [code]).fetchone()
+    codes = set()
+    db = get_db(db)
+    try:
+        while len(codes) < count:
+            candidates = set()
+            while len(candidates) < count - len(codes):
+                candidates.add(''.join(secrets.choice(characters) for _ in range(6)))
+            candidates -= codes
+            placeholders = ','.join('?' * len(candidates))
+            for row in db.execute(f'SELECT ticket_code FROM tickets WHERE ticket_code IN ({placeholders})',
+                                  list(candidates)):
+                candidates.discard(row['ticket_code'])
+            codes |= candidates
+    finally:
         db.close()
-        if not existing:
-            return code
+    return list(codes)
+
+# Constructive ticket generation.
+#
+# A valid ticket is a 3x9 layout with 5 numbers per row and 1-3 per column,
+# plus sorted values for every column. Counting the ways to finish the
+# remaining columns for each (row0, row1, row2) count still needed lets us
+# sample the layout column by column with exact weights, so every valid
+# ticket is equally likely and generation never retries.
+COLUMN_RANGES = [
+    (1, 9), (10, 19), (20, 29), (30, 39), (40, 49),
+    (50, 59), (60, 69), (70, 79), (80, 90)
+]
+ROW_SUBSETS = [tuple(row for row in range(3) if subset >> row & 1) for subset in range(1, 8)]
+
+def _build_layout_tables():
+    """For each column and (row0, row1, row2) count still needed, the row
+    subsets that can be filled there and their cumulative weights"""
+    counts = [collections.defaultdict(int) for _ in range(10)]
+    counts[9][(0, 0, 0)] = 1
+    for col in range(8, -1, -1):
+        size = COLUMN_RANGES[col][1] - COLUMN_RANGES[col][0] + 1
+        for needed, ways in list(counts[col + 1].items()):
+            for rows in ROW_SUBSETS:
+                before = tuple(needed[r] + (r in rows) for r in range(3))
+                if max(before) <= 5:
+                    counts[col][before] += math.comb(size, len(rows)) * ways
+    
+    tables = [{} for _ in range(9)]
+    for col in range(9):
+        size = COLUMN_RANGES[col][1] - COLUMN_RANGES[col][0] + 1
+        for needed in counts[col]:
+            choices = []
+            cum_weights = []
+            total = 0
+            for rows in ROW_SUBSETS:
+                after = tuple(needed[r] - (r in rows) for r in range(3))
+                ways = counts[col + 1].get(after, 0)
+                if ways:
+                    total += math.comb(size, len(rows)) * ways
+                    choices.append((rows, after))
+                    cum_weights.append(total)
+            tables[col][needed] = (choices, cum_weights)
+    return tables
+
+LAYOUT_TABLES = _build_layout_tables()
 
 def generate_tambola_ticket():
-    """Generate a proper Tambola ticket with correct structure"""
+    """Generate a uniformly random valid Tambola ticket in constant time"""
     ticket = [[0]*9 for _ in range(3)]
+    needed = (5, 5, 5)
     
-    column_ranges = [
-        (1, 9), (10, 19), (20, 29), (30, 39), (40, 49),
-        (50, 59), (60, 69), (70, 79), (80, 90)
-    ]
-    
-    # Step 1: Ensure each column has exactly 1, 2, or 3 numbers (at least 1)
-    # First, assign exactly 1 number to each column
     for col in range(9):
-        start, end = column_ranges[col]
-        available_numbers = list(range(start, end + 1))
-        random.shuffle(available_numbers)
-        
-        # Choose a random row for this column
-        row = random.randint(0, 2)
-        ticket[row][col] = available_numbers[0]
-    
-    # Step 2: We now have 9 numbers, need 6 more to reach 15 total
-    numbers_added = 0
-    max_attempts = 100
-    attempts = 0
-    
-    while numbers_added < 6 and attempts < max_attempts:
-        attempts += 1
-        
-        # Choose a random column that can accept more numbers (max 3 per column)
-        col = random.randint(0, 8)
-        numbers_in_col = sum(1 for row in range(3) if ticket[row][col] != 0)
-        if numbers_in_col >= 3:
-            continue
-        
-        # Choose a random row in this column that's empty
-        empty_rows = [row for row in range(3) if ticket[row][col] == 0]
-        if not empty_rows:
-            continue
-            
-        row = random.choice(empty_rows)
+        # Pick which rows this column fills, weighted by how many tickets follow
+        choices, cum_weights = LAYOUT_TABLES[col][needed]
+        rows, needed = random.choices(choices, cum_weights=cum_weights)[0]
         
-        # Check if this row can accept more numbers (max 5 per row)
-        numbers_in_row = sum(1 for num in ticket[row] if num != 0)
-        if numbers_in_row >= 5:
-            continue
-        
-        # Generate a valid number for this column
-        start, end = column_ranges[col]
-        existing_numbers = [ticket[r][col] for r in range(3) if ticket[r][col] != 0]
-        available_numbers = [n for n in range(start, end + 1) if n not in existing_numbers]
-        
-        if available_numbers:
-            ticket[row][col] = random.choice(available_numbers)
-            numbers_added += 1
-    
-    # Step 3: If we couldn't place all numbers, use a more direct approach
-    if numbers_added < 6:
-        # Find all empty cells that can accept numbers
-        empty_cells = []
-        for row in range(3):
-            for col in range(9):
-                if ticket[row][col] == 0:
-                    numbers_in_col = sum(1 for r in range(3) if ticket[r][col] != 0)
-                    numbers_in_row = sum(1 for num in ticket[row] if num != 0)
-                    if numbers_in_col < 3 and numbers_in_row < 5:
-                        empty_cells.append((row, col))
-        
-        # Shuffle and fill remaining numbers
-        random.shuffle(empty_cells)
-        cells_to_fill = min(6 - numbers_added, len(empty_cells))
-        
-        for i in range(cells_to_fill):
-            row, col = empty_cells[i]
-            start, end = column_ranges[col]
-            existing_numbers = [ticket[r][col] for r in range(3) if ticket[r][col] != 0]
-            available_numbers = [n for n in range(start, end + 1) if n not in existing_numbers]
-            
-            if available_numbers:
-                ticket[row][col] = random.choice(available_numbers)
-                numbers_added += 1
-    
-    # Step 4: Sort numbers in each column
-    for col in range(9):
-        sort_column_numbers(ticket, col)
-    
-    # Final verification
-    total_numbers = count_ticket_numbers(ticket)
-    if total_numbers != 15:
-        print(f"Warning: Ticket has {total_numbers} numbers instead of 15")
+        # Fill the chosen cells with sorted values from the column's range
+        start, end = COLUMN_RANGES[col]
+        values = sorted(random.sample(range(start, end + 1), len(rows)))
+        for row, value in zip(rows, values):
+            ticket[row][col] = value
     
     return ticket
 
-def sort_column_numbers(ticket, col):
-    """Sort numbers in a column while keeping their row positions"""
-    numbers = []
-    rows = []
-    
-    # Collect numbers and their rows
-    for row in range(3):
-        if ticket[row][col] != 0:
-            numbers.append(ticket[row][col])
-            rows.append(row)
-    
-    # Sort numbers and keep track of original rows
-    sorted_data = sorted(zip(numbers, rows))
-    
-    # Clear column
-    for row in range(3):
-        ticket[row][col] = 0
-    
-    # Place sorted numbers back in their rows
-    for number, row in sorted_data:
-        ticket[row][col] = number
-        
+# Full strips: 6 tickets holding each of 1-90 exactly once.
+#
+# Every ticket column starts with one number. The rest of each column's
+# numbers (3 in the first column, 5 in the last, 4 elsewhere) are dealt
+# out, at most 2 more per ticket column, until every ticket has 15; a
+# deal is only taken if the remaining columns can still finish the strip,
+# so construction never backtracks.
+STRIP_SIZE = 6
+STRIP_EXTRAS = [end - start + 1 - STRIP_SIZE for start, end in COLUMN_RANGES]
+STRIP_DEALS = {extra: [deal for deal in itertools.product(range(3), repeat=STRIP_SIZE) if sum(deal) == extra]
+               for extra in set(STRIP_EXTRAS)}
+
+@functools.lru_cache(maxsize=None)
+def _strip_deals(col, needs):
+    """Deals of column col's extra numbers that leave the strip completable.
 
+    needs is the sorted count of extra numbers each ticket still needs, and
+    each deal lines up with it; there are only a few hundred such states.
+    """
+    deals = []
+    for deal in STRIP_DEALS[STRIP_EXTRAS[col]]:
+        after = tuple(need - extra for need, extra in zip(needs, deal))
+        if min(after) < 0:
+            continue
+        if col + 1 == len(COLUMN_RANGES):
+            complete = not any(after)
+        else:
+            complete = bool(_strip_deals(col + 1, tuple(sorted(after))))
+        if complete:
+            deals.append(deal)
+    return deals
+
+def _layout_strip_ticket(columns):
+    """Place one strip ticket's sorted column values so every row gets 5.
 
-def generate_tambola_ticket_fallback():
-    """Fallback method that guarantees correct structure"""
+    Filling the largest columns first, each into the rows that still need
+    the most numbers, always succeeds for column sizes 1-3 summing to 15.
+    """
     ticket = [[0]*9 for _ in range(3)]
-    
-    # Step 1: Ensure each column has at least 1 number
-    for col in range(9):
-        start_num = col * 10 + 1
-        end_num = start_num + 9
-        if col == 0:
-            start_num = 1
-            end_num = 9
-        elif col == 8:
-            start_num = 80
-            end_num = 90
-        
-        available_numbers = list(range(start_num, end_num + 1))
-        random.shuffle(available_numbers)
-        
-        # Place one number in a random row
-        row = random.randint(0, 2)
-        ticket[row][col] = available_numbers[0]
-    
-    # Step 2: We now have 9 numbers, need 6 more to reach 15 total
-    numbers_added = 0
-    while numbers_added < 6:
-        col = random.randint(0, 8)
-        row = random.randint(0, 2)
-        
-        # Check if this cell is empty and column has less than 3 numbers
-        if ticket[row][col] == 0:
-            numbers_in_col = sum(1 for r in range(3) if ticket[r][col] != 0)
-            if numbers_in_col < 3:
-                start_num = col * 10 + 1
-                end_num = start_num + 9
-                if col == 0:
-                    start_num = 1
-                    end_num = 9
-                elif col == 8:
-                    start_num = 80
-                    end_num = 90
-                
-                existing_numbers = [ticket[r][col] for r in range(3) if ticket[r][col] != 0]
-                available_numbers = [n for n in range(start_num, end_num + 1) 
-                                   if n not in existing_numbers]
-                if available_numbers:
-                    ticket[row][col] = random.choice(available_numbers)
-                    numbers_added += 1
-    
+    needed = [5, 5, 5]
+    order = list(range(9))
+    random.shuffle(order)
+    for col in sorted(order, key=lambda col: -len(columns[col])):
+        rows = sorted(range(3), key=lambda row: (-needed[row], random.random()))[:len(columns[col])]
+        for row, value in zip(sorted(rows), columns[col]):
+            ticket[row][col] = value
+            needed[row] -= 1
     return ticket
 
-def can_accept_number(self, ticket, row, col, col_range):
-    """Check if a cell can accept a number without violating rules"""
-    start, end = col_range
-    
-    # Check if adding a number here would exceed column limit
-    numbers_in_col = sum(1 for r in range(3) if ticket[r][col] != 0)
-    if numbers_in_col >= 3:
-        return False
-    
-    # Check if the number would be in the correct range
-    # This is handled by the calling function
-    return True
+def generate_ticket_strip():
+    """Generate a full strip of 6 valid tickets covering 1-90 exactly once"""
+    needs = [15 - len(COLUMN_RANGES)] * STRIP_SIZE
+    sizes = [[1] * len(COLUMN_RANGES) for _ in range(STRIP_SIZE)]
+    for col in range(len(COLUMN_RANGES)):
+        order = sorted(range(STRIP_SIZE), key=lambda index: needs[index])
+        deal = random.choice(_strip_deals(col, tuple(needs[index] for index in order)))
+        for index, extra in zip(order, deal):
+            sizes[index][col] += extra
+            needs[index] -= extra
+    
+    # Deal each column's shuffled numbers out in the chosen sizes
+    columns = [[None] * len(COLUMN_RANGES) for _ in range(STRIP_SIZE)]
+    for col, (start, end) in enumerate(COLUMN_RANGES):
+        numbers = random.sample(range(start, end + 1), end - start + 1)
+        for index in range(STRIP_SIZE):
+            size = sizes[index][col]
+            columns[index][col] = sorted(numbers[:size])
+            numbers = numbers[size:]
+    strip = [_layout_strip_ticket(ticket_columns) for ticket_columns in columns]
+    for ticket in strip:
+        result = validate_ticket(ticket)
+        if not result.valid:
+            raise ValueError(f"Generated an invalid ticket: {'; '.join(result.errors)}")
+    return strip
 
+def ticket_fingerprint(ticket):
+    """Stable key for used_tickets: BLAKE2b of the ticket's three row bitmasks.
 
+    Unlike hash(), this is the same in every process and across restarts.
+    """
+    if isinstance(ticket, Ticket):
+        return ticket.fingerprint
+    return rows_fingerprint(numbers_mask(row) for row in ticket)
 
-def is_ticket_unique(ticket):
-    """Check if this ticket is unique by creating a hash"""
-    ticket_str = json.dumps(ticket, sort_keys=True)
-    ticket_hash = str(hash(ticket_str))
-    
-    db = get_db()
-    result = db.execute('SELECT * FROM used_tickets WHERE ticket_hash = ?', [ticket_hash]).fetchone()
-    db.close()
-    
-    return result is None
+def rows_fingerprint(row_masks):
+    digest = hashlib.blake2b(digest_size=16)
+    for mask in row_masks:
+        digest.update(mask.to_bytes(12, 'big'))
+    return digest.hexdigest()
 
-def mark_ticket_used(ticket):
-    """Mark ticket as used to prevent duplicates"""
-    ticket_str = json.dumps(ticket, sort_keys=True)
-    ticket_hash = str(hash(ticket_str))
-    
-    db = get_db()
+# Compact ticket encoding: the 15 numbers row by row, one byte each. A
+# number's column follows from its value, so this is the whole layout;
+# rows with fewer than 5 numbers are padded with 0.
+TICKET_BYTES = 15
+
+def number_column(number):
+    return min(number // 10, len(COLUMN_RANGES) - 1)
+
+NUMBER_COLUMNS = [number_column(number) for number in range(91)]
+
+def encode_ticket(ticket):
+    """15-byte form of a 3x9 ticket"""
+    data = bytearray()
+    for row in ticket:
+        numbers = [num for num in row if num]
+        if len(numbers) > 5:
+            raise ValueError(f"Ticket row has {len(numbers)} numbers")
+        data += bytes(numbers) + bytes(5 - len(numbers))
+    return bytes(data)
+
+def decode_ticket(data):
+    """3x9 ticket from its 15-byte form"""
+    ticket = [[0] * 9, [0] * 9, [0] * 9]
+    for index, number in enumerate(data):
+        if number:
+            ticket[index // 5][NUMBER_COLUMNS[number]] = number
+    return ticket
+
+def load_ticket(ticket_data):
+    """Ticket from a ticket_data column: a 15-byte BLOB, or JSON text from before compact_ticket_data"""
+    if isinstance(ticket_data, bytes):
+        return decode_ticket(ticket_data)
+    return json.loads(ticket_data)
+
+def reserve_tickets(db, tickets):
+    """Record tickets in used_tickets in the caller's transaction.
+
+    Returns the tickets that were not already used; each is a single
+    INSERT ... ON CONFLICT, so there is no SELECT-then-INSERT race.
+    """
+    reserved = []
+    for ticket in tickets:
+        cursor = db.execute(
+            'INSERT INTO used_tickets (ticket_hash) VALUES (?) ON CONFLICT(ticket_hash) DO NOTHING',
+            [ticket_fingerprint(ticket)]
+        )
+        if cursor.rowcount == 1:
+            reserved.append(ticket)
+    return reserved
+
+TICKET_POOL_SIZE = 200
+TICKET_POOL_LOW_WATER = 50
+TICKET_POOL_BATCH = 50
+
+def generate_ticket_batch(count, db=None):
+    """Generate (ticket, ticket_code) pairs whose ticket and code are both unused.
+
+    Candidates are checked against used_tickets and tickets with one query
+    each per round instead of one connection per candidate.
+    """
+    entries = []
+    db = get_db(db)
     try:
-        db.execute('INSERT INTO used_tickets (ticket_hash) VALUES (?)', [ticket_hash])
-        db.commit()
-        db.close()
-        return True
-    except sqlite3.IntegrityError:
+        while len(entries) < count:
+            needed = count - len(entries)
+            tickets = {}
+            while len(tickets) < needed:
+                ticket = generate_tambola_ticket()
+                result = validate_ticket(ticket)
+                if not result.valid:
+                    raise ValueError(f"Generated an invalid ticket: {'; '.join(result.errors)}")
+                tickets[ticket_fingerprint(ticket)] = ticket
+            
+            fingerprints = list(tickets)
+            placeholders = ','.join('?' * needed)
+            for row in db.execute(f'SELECT ticket_hash FROM used_tickets WHERE ticket_hash IN ({placeholders})', fingerprints):
+                del tickets[row['ticket_hash']]
+            
+            entries.extend(zip(tickets.values(), generate_ticket_codes(len(tickets), db)))
+    finally:
         db.close()
-        return False
-
-def generate_unique_ticket():
-    """Generate a unique ticket that hasn't been used before"""
-    max_attempts = 50
-    for _ in range(max_attempts):
-        ticket = generate_tambola_ticket()
-        if is_ticket_unique(ticket):
-            if mark_ticket_used(ticket):
-                return ticket
-    # If no unique ticket found after max attempts, return any ticket
-    return generate_tambola_ticket()
+    return entries[:count]
 
-def count_ticket_numbers(ticket):
-    """Count total numbers in ticket and verify row and column counts"""
+class TicketPool:
+    """Pre-generated (ticket, ticket_code) pairs so registration is a pop.
+
+    A daemon thread, started on first use, refills the pool whenever it
+    drops below the low-water mark. Tickets are only written to
+    used_tickets when a registration actually takes them.
+    """
+
+    def __init__(self, size=TICKET_POOL_SIZE, low_water=TICKET_POOL_LOW_WATER):
+        self.size = size
+        self.low_water = low_water
+        self.entries = collections.deque()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.worker, daemon=True)
+                self.thread.start()
+                self.wakeup.set()
+
+    def worker(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            try:
+                while len(self.entries) < self.size:
+                    batch = min(TICKET_POOL_BATCH, self.size - len(self.entries))
+                    self.entries.extend(generate_ticket_batch(batch))
+            except Exception as e:
+                print(f"Ticket pool refill error: {e}")
+                time.sleep(1)
+                self.wakeup.set()
+
+    def take(self):
+        """Pop a (ticket, ticket_code) pair, generating one inline if the pool is empty"""
+        self.start()
+        try:
+            entry = self.entries.popleft()
+        except IndexError:
+            entry = generate_ticket_batch(1)[0]
+        if len(self.entries) < self.low_water:
+            self.wakeup.set()
+        return entry
+
+ticket_pool = TicketPool()
+
+class TicketValidation(collections.namedtuple('TicketValidation', 'total row_counts col_counts errors')):
+    """Result of validate_ticket()"""
+    __slots__ = ()
+
+    @property
+    def valid(self):
+        return not self.errors
+
+def validate_ticket(ticket):
+    """Check a ticket's structure: 15 numbers, 5 per row, 1-3 per column, in range"""
     total = 0
     row_counts = [0, 0, 0]
     col_counts = [0] * 9
+    errors = []
+    
+    if len(ticket) != 3 or any(len(row) != 9 for row in ticket):
+        return TicketValidation(0, row_counts, col_counts, ["Ticket must be 3 rows of 9 cells"])
     
     for row_idx, row in enumerate(ticket):
         for col_idx, num in enumerate(row):
@@ -321,244 +865,920 @@ def count_ticket_numbers(ticket):
                 total += 1
                 row_counts[row_idx] += 1
                 col_counts[col_idx] += 1
+                start, end = COLUMN_RANGES[col_idx]
+                if not start <= num <= end:
+                    errors.append(f"Number {num} is out of range for column {col_idx}")
     
-    print(f"Ticket verification:")
-    print(f"Total numbers: {total}")
-    print(f"Row counts: {row_counts}")
-    print(f"Column counts: {col_counts}")
-    
-    # Verify rules
     if total != 15:
-        print(f"ERROR: Total numbers should be 15, got {total}")
+        errors.append(f"Total numbers should be 15, got {total}")
     
     for i, count in enumerate(row_counts):
         if count != 5:
-            print(f"ERROR: Row {i} should have 5 numbers, got {count}")
+            errors.append(f"Row {i} should have 5 numbers, got {count}")
     
     for i, count in enumerate(col_counts):
         if count == 0:
-            print(f"ERROR: Column {i} has no numbers!")
+            errors.append(f"Column {i} has no numbers!")
         if count > 3:
-            print(f"ERROR: Column {i} has {count} numbers (max 3)")
+            errors.append(f"Column {i} has {count} numbers (max 3)")
     
-    return total
-    
-def claim_prize(user_id, ticket_code, prize_type, user_name):
-    """Submit a prize claim for admin approval"""
+    return TicketValidation(total, row_counts, col_counts, errors)
+
+def count_ticket_numbers(ticket):
+    """Count total numbers in ticket; structural checks are only reported in debug mode"""
+    if app.debug:
+        result = validate_ticket(ticket)
+        for error in result.errors:
+            print(f"Ticket validation error: {error}")
+        return result.total
+    if isinstance(ticket, Ticket):
+        return ticket.count
+    return sum(1 for row in ticket for num in row if num != 0)
+
+def user_numbers_count(user):
+    """Numbers on a user's tickets, from the count stored at registration"""
+    if user['numbers_count'] is not None:
+        return user['numbers_count']
+    return count_ticket_numbers(load_ticket(user['ticket_data']))
+    
+def bump_game_version(db, game_id):
+    """Advance a game's version in the caller's transaction and return it"""
+    db.execute('UPDATE games SET version = version + 1 WHERE id = ?', [game_id])
+    return db.execute('SELECT version FROM games WHERE id = ?', [game_id]).fetchone()['version']
+
+def begin_immediate(db):
+    """Start a write transaction now, taking SQLite's write lock up front"""
+    if db.in_transaction:
+        db.commit()
+    db.execute('BEGIN IMMEDIATE')
+
+def claim_prize(user_id, ticket_code, prize_type, user_name, db=None):
+    """Submit a prize claim for admin approval.
+
+    The checks and the insert run in one BEGIN IMMEDIATE transaction, and
+    the partial unique indexes from migration 4 reject anything that still
+    slips through (one active claim per user and prize).
+    """
+    db = get_db(db)
     try:
-        db = get_db()
+        begin_immediate(db)
+        
+        # Claims belong to the claimant's game
+        user = db.execute('SELECT game_id FROM users WHERE id = ?', [user_id]).fetchone()
+        if not user:
+            db.rollback()
+            return False, "User not found"
+        game_id = user['game_id']
         
         # Check if this prize type is already approved
         existing_approved = db.execute(
-            'SELECT * FROM prizes WHERE prize_type = ? AND status = "approved"', 
-            [prize_type]
+            "SELECT 1 FROM prizes WHERE game_id = ? AND prize_type = ? AND status = 'approved'", 
+            [game_id, prize_type]
         ).fetchone()
         
         if existing_approved:
-            db.close()
+            db.rollback()
             return False, "This prize has already been claimed and approved!"
         
         # Check if user already has a pending or approved claim for this prize
         user_existing = db.execute(
-            'SELECT * FROM prizes WHERE user_id = ? AND prize_type = ? AND status IN ("pending", "approved")', 
+            "SELECT status FROM prizes WHERE user_id = ? AND prize_type = ? AND status IN ('pending', 'approved')", 
             [user_id, prize_type]
         ).fetchone()
         
         if user_existing:
-            db.close()
+            db.rollback()
             if user_existing['status'] == 'pending':
                 return False, "You already have a pending claim for this prize!"
             else:
                 return False, "You have already claimed this prize!"
         
-        # Submit the claim for approval
+        # Submit the claim for approval, noting how many numbers were called
+        # by then; the write lock keeps the count from moving meanwhile
+        claimed_call = db.execute('SELECT COUNT(*) FROM called_numbers WHERE game_id = ?', [game_id]).fetchone()[0]
         db.execute(
-            'INSERT INTO prizes (user_id, ticket_code, user_name, prize_type, status) VALUES (?, ?, ?, ?, "pending")',
-            [user_id, ticket_code, user_name, prize_type]
+            "INSERT INTO prizes (game_id, user_id, ticket_code, user_name, prize_type, status, claimed_call) "
+            "VALUES (?, ?, ?, ?, ?, 'pending', ?)",
+            [game_id, user_id, ticket_code, user_name, prize_type, claimed_call]
         )
         db.commit()
-        db.close()
         return True, "Prize claim submitted for admin approval!"
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return False, "You already have a pending claim for this prize!"
     except Exception as e:
+        db.rollback()
         return False, f"Error submitting claim: {str(e)}"
-    
-    # Submit the claim for approval
-    try:
-        db.execute(
-            'INSERT INTO prizes (user_id, ticket_code, user_name, prize_type, status) VALUES (?, ?, ?, ?, "pending")',
-            [user_id, ticket_code, user_name, prize_type]
-        )
-        db.commit()
-        db.close()
-        return True, "Prize claim submitted for admin approval!"
-    except Exception as e:
+    finally:
         db.close()
-        return False, f"Error submitting claim: {str(e)}"
 
-def get_prize_claims():
-    """Get all prize claims with user details"""
-    db = get_db()
+def get_prize_claims(db=None, game_id=DEFAULT_GAME_ID):
+    """Get all prize claims of a game with user details"""
+    db = get_db(db)
     claims = db.execute('''
         SELECT p.*, u.name 
         FROM prizes p 
         JOIN users u ON p.user_id = u.id 
+        WHERE p.game_id = ?
         ORDER BY p.claimed_at DESC
-    ''').fetchall()
-    db.close()
-    return claims
-
-def get_pending_claims():
-    """Get all pending prize claims for admin approval"""
-    db = get_db()
-    claims = db.execute('''
-        SELECT p.*, u.name 
-        FROM prizes p 
-        JOIN users u ON p.user_id = u.id 
-        WHERE p.status = 'pending'
-        ORDER BY p.claimed_at ASC
-    ''').fetchall()
+    ''', [game_id]).fetchall()
     db.close()
     return claims
 
-def get_approved_claims():
-    """Get all approved prize claims"""
-    db = get_db()
+def get_approved_claims(db=None, game_id=DEFAULT_GAME_ID):
+    """Get all approved prize claims of a game"""
+    db = get_db(db)
     claims = db.execute('''
         SELECT p.*, u.name 
         FROM prizes p 
         JOIN users u ON p.user_id = u.id 
-        WHERE p.status = 'approved'
+        WHERE p.game_id = ? AND p.status = 'approved'
         ORDER BY p.approved_at DESC
-    ''').fetchall()
+    ''', [game_id]).fetchall()
     db.close()
     return claims
 
+# Pattern engine: a set of numbers is an int with bit n set for number n, so
+# every pattern check is a few AND/popcount operations.
+PATTERNS = {}
+
+def numbers_mask(numbers):
+    """Bitmask of the non-zero numbers in an iterable"""
+    mask = 0
+    for number in numbers:
+        if number:
+            mask |= 1 << number
+    return mask
+
+def register_pattern(name, build):
+    """Register a pattern.
+
+    build(ticket, rows) gets the 3x9 ticket and its three row masks and
+    returns a tuple of (mask, required) clauses; the pattern is complete once
+    every clause has at least `required` of its numbers called.
+    """
+    PATTERNS[name] = build
+
+def _all_of(mask):
+    return ((mask, mask.bit_count()),)
+
+def _corners(ticket, rows):
+    """Example of a non-line pattern: the first and last number of the top and
+    bottom rows. Not registered, so it is not a prize; register_pattern('corners',
+    _corners) together with the house rules and claim buttons to offer it."""
+    corners = 0
+    for row in (ticket[0], ticket[2]):
+        numbers = [n for n in row if n]
+        if numbers:
+            corners |= numbers_mask([min(numbers), max(numbers)])
+    return _all_of(corners)
+
+register_pattern('first_line', lambda ticket, rows: _all_of(rows[0]))
+register_pattern('middle_line', lambda ticket, rows: _all_of(rows[1]))
+register_pattern('bottom_line', lambda ticket, rows: _all_of(rows[2]))
+register_pattern('early_five', lambda ticket, rows: ((rows[0] | rows[1] | rows[2], 5),))
+register_pattern('full_house', lambda ticket, rows: _all_of(rows[0] | rows[1] | rows[2]))
+
+def compile_ticket(ticket):
+    """Precompute the clauses of every registered pattern for a 3x9 ticket"""
+    if isinstance(ticket, Ticket):
+        rows = ticket.row_masks
+    else:
+        rows = tuple(numbers_mask(row) for row in ticket)
+    return {name: build(ticket, rows) for name, build in PATTERNS.items()}
+
 def check_ticket_patterns(ticket, called_numbers):
-    """Check which patterns are completed on the ticket"""
-    patterns = {
-        'first_line': all(num == 0 or num in called_numbers for num in ticket[0]),
-        'middle_line': all(num == 0 or num in called_numbers for num in ticket[1]),
-        'bottom_line': all(num == 0 or num in called_numbers for num in ticket[2]),
-        'early_five': len([num for row in ticket for num in row if num != 0 and num in called_numbers]) >= 5,
-        'full_house': all(num == 0 or num in called_numbers for row in ticket for num in row)
-    }
-    return patterns
+    """Check which patterns are completed on the ticket.
 
-def approve_prize_claim(claim_id, approved_by="admin"):
-    """Approve a prize claim"""
-    db = get_db()
-    
-    # Check if this prize type is already approved by someone else
-    claim = db.execute('SELECT * FROM prizes WHERE id = ?', [claim_id]).fetchone()
-    if not claim:
-        db.close()
-        return False, "Claim not found"
-    
-    existing_approved = db.execute(
-        'SELECT * FROM prizes WHERE prize_type = ? AND status = "approved" AND id != ?', 
-        [claim['prize_type'], claim_id]
-    ).fetchone()
-    
-    if existing_approved:
+    called_numbers may be a list of numbers or an already built bitmask
+    such as a game's state.called_mask.
+    """
+    return check_tickets_patterns([ticket], called_numbers)[0]
+
+def check_tickets_patterns(tickets, called_numbers):
+    """check_ticket_patterns for many tickets at once.
+
+    Every clause of every ticket goes into one flat list that is tested
+    against the called mask in a single pass, and failures are folded back
+    into one {pattern: completed} dict per ticket.
+    """
+    if isinstance(called_numbers, int):
+        called_mask = called_numbers
+    else:
+        called_mask = numbers_mask(called_numbers)
+    names = list(PATTERNS)
+    masks = []
+    required = []
+    owners = []  # ticket index * patterns + pattern index
+    for ticket_index, ticket in enumerate(tickets):
+        clauses = ticket.clauses if isinstance(ticket, Ticket) else compile_ticket(ticket)
+        for pattern_index, name in enumerate(names):
+            owner = ticket_index * len(names) + pattern_index
+            for mask, needed in clauses[name]:
+                masks.append(mask)
+                required.append(needed)
+                owners.append(owner)
+    
+    results = [dict.fromkeys(names, True) for _ in tickets]
+    hits = [(mask & called_mask).bit_count() for mask in masks]
+    for owner, count, needed in zip(owners, hits, required):
+        if count < needed:
+            results[owner // len(names)][names[owner % len(names)]] = False
+    return results
+
+class Ticket:
+    """An issued ticket with everything derived from its numbers computed once.
+
+    It reads like the 3x9 grid (rows can be indexed and iterated), so it
+    goes anywhere a ticket list does; the numbers never change, so the
+    masks, fingerprint, stored form and pattern clauses are worked out on
+    construction or first use and kept.
+
+    Legacy tickets whose rows do not fit the 15-byte layout load fine; their
+    stored form stays the JSON text they were saved as.
+    """
+    __slots__ = ('code', 'rows', 'row_masks', 'mask', 'fingerprint', '_data', '_clauses')
+
+    def __init__(self, grid, code=None, data=None):
+        self.code = code
+        self.rows = tuple(tuple(row) for row in grid)
+        self.row_masks = tuple(numbers_mask(row) for row in self.rows)
+        self.mask = 0
+        for mask in self.row_masks:
+            self.mask |= mask
+        self.fingerprint = rows_fingerprint(self.row_masks)
+        self._data = data
+        self._clauses = None
+
+    @classmethod
+    def load(cls, ticket_data, code=None):
+        """Ticket from a ticket_data column"""
+        return cls(load_ticket(ticket_data), code, ticket_data)
+
+    @property
+    def data(self):
+        """Stored form: the ticket_data it was loaded from, else the 15-byte encoding"""
+        if self._data is None:
+            self._data = encode_ticket(self.rows)
+        return self._data
+
+    @property
+    def count(self):
+        return self.mask.bit_count()
+
+    @property
+    def clauses(self):
+        if self._clauses is None:
+            self._clauses = compile_ticket(self)
+        return self._clauses
+
+    def patterns(self, called_numbers):
+        return check_ticket_patterns(self, called_numbers)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __eq__(self, other):
+        if isinstance(other, Ticket):
+            return self.rows == other.rows
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.rows)
+
+    def __repr__(self):
+        return f'Ticket({self.code!r}, {[list(row) for row in self.rows]})'
+
+class Player:
+    """A registered player and their tickets, in registration order"""
+    __slots__ = ('id', 'game_id', 'name', 'device_id', 'ticket_code', 'tickets')
+
+    def __init__(self, id, game_id, name, device_id, ticket_code, tickets):
+        self.id = id
+        self.game_id = game_id
+        self.name = name
+        self.device_id = device_id
+        self.ticket_code = ticket_code
+        self.tickets = tuple(tickets)
+
+    @property
+    def numbers_count(self):
+        return sum(ticket.count for ticket in self.tickets)
+
+    def ticket(self, code):
+        for ticket in self.tickets:
+            if ticket.code == code:
+                return ticket
+        return None
+
+def load_player(ticket_code, db=None):
+    """The Player owning any one of their ticket codes, or None"""
+    db = get_db(db)
+    rows = db.execute('''SELECT u.id, u.game_id, u.name, u.device_id, u.ticket_code AS player_code,
+                                t.ticket_code, t.ticket_data
+                         FROM tickets owner
+                         JOIN users u ON u.id = owner.user_id
+                         JOIN tickets t ON t.user_id = u.id
+                         WHERE owner.ticket_code = ?
+                         ORDER BY t.id ASC''', [ticket_code]).fetchall()
+    db.close()
+    if not rows:
+        return None
+    first = rows[0]
+    return Player(first['id'], first['game_id'], first['name'], first['device_id'], first['player_code'],
+                  [Ticket.load(row['ticket_data'], row['ticket_code']) for row in rows])
+
+def reset_generation(db):
+    """Changes whenever tables are dropped and recreated, as /admin/reset-db does,
+    so every worker can tell its cached rows are gone"""
+    return db.execute('PRAGMA schema_version').fetchone()[0]
+
+PLAYER_CACHE_SIZE = 4096
+
+class PlayerCache:
+    """LRU of Player objects by ticket code, for /ticket views and claims.
+
+    Players and their tickets never change after registration, so entries
+    only go stale when the database is reset. A reset by any worker changes
+    the reset generation, which every lookup checks. Unknown codes are not
+    cached: they may belong to a registration that has not happened yet.
+    """
+
+    def __init__(self, size=PLAYER_CACHE_SIZE):
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.generation = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ticket_code, db=None):
+        """The player owning ticket_code, or None"""
+        db = get_db(db)
+        try:
+            generation = reset_generation(db)
+            with self.lock:
+                if generation != self.generation:
+                    self.entries.clear()
+                    self.generation = generation
+                player = self.entries.get(ticket_code)
+                if player is not None:
+                    self.entries.move_to_end(ticket_code)
+                    self.hits += 1
+                    return player
+                self.misses += 1
+            player = load_player(ticket_code, db)
+            if player is not None:
+                with self.lock:
+                    if self.generation == generation:
+                        self.entries[ticket_code] = player
+                        while len(self.entries) > self.size:
+                            self.entries.popitem(last=False)
+            return player
+        finally:
+            db.close()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+player_cache = PlayerCache()
+
+class WinnerIndex:
+    """Inverted index from each number to the pattern clauses that contain it.
+
+    Every (ticket, pattern, clause) of one game gets a slot with a hit
+    counter, so a call only touches the slots holding the called number and
+    reports exactly the (ticket_code, pattern) pairs it completed. Counters
+    live in flat arrays to keep 100k tickets within a few tens of MB.
+
+    Indexing every ticket is the slow part, so build() does it when the
+    game is loaded; calls then only add increments.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.lock = threading.RLock()
+        self.ready = False  # set once build() has indexed the game
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.pattern_names = list(PATTERNS)
+            self.codes = []                                  # ticket index -> ticket_code
+            self.postings = [array('I') for _ in range(91)]  # number -> slots
+            self.slot_owner = array('I')     # slot -> ticket index * patterns + pattern index
+            self.slot_required = array('B')
+            self.initial_open = array('B')   # (ticket, pattern) -> clauses open before any call
+            self.last_ticket_id = 0
+            self.slot_hits = array('B')
+            self.restart()
+
+    def restart(self):
+        """Forget every call but keep the indexed tickets, for when numbers are reset"""
+        with self.lock:
+            self.slot_hits = array('B', bytes(len(self.slot_hits)))
+            self.open_clauses = array('B', self.initial_open)  # (ticket, pattern) -> clauses still unsatisfied
+            self.applied = []                # called numbers already counted, in order
+            self.applied_mask = 0
+            self.completions = []            # (ticket_code, pattern, call_index)
+            self.completed_at = {}           # (ticket_code, pattern) -> call_index
+            self.first_completion = {}       # pattern -> (call_index, {ticket_codes})
+
+    def build(self):
+        """Index the game's tickets and calls so far, off the request path"""
+        try:
+            self.sync()
+        except Exception as e:
+            print(f"Error building winner index for game {self.state.game_id}: {e}")
+        self.ready = True
+
+    def add_ticket(self, code, ticket):
+        """Index a ticket, counting numbers that were called before it joined"""
+        compiled = ticket.clauses if isinstance(ticket, Ticket) else compile_ticket(ticket)
+        ticket_index = len(self.codes)
+        self.codes.append(code)
+        for pattern_index, name in enumerate(self.pattern_names):
+            clauses = compiled[name]
+            owner = ticket_index * len(self.pattern_names) + pattern_index
+            still_open = len(clauses)
+            self.initial_open.append(sum(1 for _, required in clauses if required > 0))
+            for mask, required in clauses:
+                slot = len(self.slot_owner)
+                hits = (mask & self.applied_mask).bit_count()
+                self.slot_owner.append(owner)
+                self.slot_required.append(required)
+                self.slot_hits.append(hits)
+                if hits >= required:
+                    still_open -= 1
+                while mask:
+                    low = mask & -mask
+                    self.postings[low.bit_length() - 1].append(slot)
+                    mask ^= low
+            self.open_clauses.append(still_open)
+            if not still_open and self.applied:
+                self.record_completions([(code, name, len(self.applied))])
+
+    def apply(self, number):
+        """Count a called number and return the patterns it completed"""
+        completed = []
+        call_index = len(self.applied) + 1
+        slot_hits = self.slot_hits
+        pattern_count = len(self.pattern_names)
+        for slot in self.postings[number]:
+            hits = slot_hits[slot] + 1
+            slot_hits[slot] = hits
+            if hits == self.slot_required[slot]:
+                owner = self.slot_owner[slot]
+                self.open_clauses[owner] -= 1
+                if not self.open_clauses[owner]:
+                    completed.append((self.codes[owner // pattern_count],
+                                      self.pattern_names[owner % pattern_count],
+                                      call_index))
+        self.applied.append(number)
+        self.applied_mask |= 1 << number
+        self.record_completions(completed)
+        return completed
+
+    def record_completions(self, completed):
+        for code, pattern, call_index in completed:
+            self.completions.append((code, pattern, call_index))
+            self.completed_at[(code, pattern)] = call_index
+            first = self.first_completion.get(pattern)
+            if first is None or call_index < first[0]:
+                self.first_completion[pattern] = (call_index, {code})
+            elif call_index == first[0]:
+                first[1].add(code)
+
+    def read_new_tickets(self, after_id):
+        """(id, Ticket) for tickets registered after after_id, decoded and compiled"""
+        db = get_db()
+        rows = db.execute(
+            'SELECT id, ticket_code, ticket_data FROM tickets WHERE game_id = ? AND id > ? ORDER BY id ASC',
+            [self.state.game_id, after_id]
+        ).fetchall()
         db.close()
-        return False, "This prize has already been approved for someone else!"
-    
-    # Approve the claim
+        tickets = []
+        for row in rows:
+            try:
+                ticket = Ticket.load(row['ticket_data'], row['ticket_code'])
+                ticket.clauses  # compiled here, outside the index lock
+            except (TypeError, ValueError) as e:
+                print(f"Skipping ticket {row['id']}: {e}")
+                ticket = None
+            tickets.append((row['id'], ticket))
+        return tickets
+
+    def sync(self):
+        """Catch up with new registrations and calls; return new completions.
+
+        Never takes the game state's lock, and new tickets are read and
+        compiled before taking the index lock, so only the counting itself
+        holds up other readers.
+        """
+        new_tickets = self.read_new_tickets(self.last_ticket_id)
+        with self.lock:
+            called = self.state.snapshot()
+            if called[:len(self.applied)] != self.applied:
+                # Numbers were reset (possibly by another worker): count the
+                # calls again, the tickets stay indexed
+                self.restart()
+            for ticket_id, ticket in new_tickets:
+                if ticket_id <= self.last_ticket_id:
+                    continue  # indexed by a concurrent sync
+                self.last_ticket_id = ticket_id
+                if ticket is not None:
+                    self.add_ticket(ticket.code, ticket)
+            completed = []
+            for number in called[len(self.applied):]:
+                completed.extend(self.apply(number))
+            return completed
+
+def approve_prize_claim(claim_id, approved_by="admin", db=None, game_id=DEFAULT_GAME_ID):
+    """Approve a prize claim.
+
+    Runs as one BEGIN IMMEDIATE transaction; the partial unique index on
+    approved prize_type guarantees a single winner even across workers.
+    """
+    db = get_db(db)
     try:
+        begin_immediate(db)
+        
+        claim = db.execute('SELECT * FROM prizes WHERE id = ? AND game_id = ?', [claim_id, game_id]).fetchone()
+        if not claim:
+            db.rollback()
+            return False, "Claim not found"
+        
+        # Check if this prize type is already approved by someone else
+        existing_approved = db.execute(
+            "SELECT 1 FROM prizes WHERE game_id = ? AND prize_type = ? AND status = 'approved' AND id != ?", 
+            [claim['game_id'], claim['prize_type'], claim_id]
+        ).fetchone()
+        
+        if existing_approved:
+            db.rollback()
+            return False, "This prize has already been approved for someone else!"
+        
+        # Approve the claim
         db.execute(
-            'UPDATE prizes SET status = "approved", approved_at = CURRENT_TIMESTAMP, approved_by = ? WHERE id = ?',
+            "UPDATE prizes SET status = 'approved', approved_at = CURRENT_TIMESTAMP, approved_by = ? WHERE id = ?",
             [approved_by, claim_id]
         )
+        version = bump_game_version(db, claim['game_id'])
+        record_event(db, claim['game_id'], 'prize', {
+            'claim_id': claim_id,
+            'prize_type': claim['prize_type'],
+            'user_name': claim['user_name'],
+            'ticket_code': claim['ticket_code']
+        })
         db.commit()
-        db.close()
-        return True, "Prize claim approved successfully!"
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return False, "This prize has already been approved for someone else!"
     except Exception as e:
-        db.close()
+        db.rollback()
         return False, f"Error approving claim: {str(e)}"
+    finally:
+        db.close()
+    
+    game = get_game(claim['game_id'])
+    if game is not None:
+        game.state.set_version(version)
+        game.events.sync(force=True)
+    return True, "Prize claim approved successfully!"
 
-def reject_prize_claim(claim_id):
+def reject_prize_claim(claim_id, db=None, game_id=DEFAULT_GAME_ID):
     """Reject a prize claim"""
-    db = get_db()
+    db = get_db(db)
     try:
-        db.execute(
-            'UPDATE prizes SET status = "rejected" WHERE id = ?',
-            [claim_id]
-        )
+        rejected = db.execute(
+            'UPDATE prizes SET status = "rejected" WHERE id = ? AND game_id = ?',
+            [claim_id, game_id]
+        ).rowcount
         db.commit()
         db.close()
+        if not rejected:
+            return False, "Claim not found"
         return True, "Prize claim rejected!"
     except Exception as e:
         db.close()
         return False, f"Error rejecting claim: {str(e)}"
         
-def generate_qr(url):
-    """Generate QR code as base64"""
-    try:
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        return base64.b64encode(buffer.getvalue()).decode()
-    except Exception as e:
-        print(f"QR Generation Error: {e}")
-        return None
+def process_pending_claims(prize_type=None, db=None, game_id=DEFAULT_GAME_ID):
+    """Verify pending claims against the called sequence and settle clear-cut ones.
+
+    Each claim gets the call index at which its pattern completed. A claim
+    whose ticket completed the pattern strictly before every other ticket,
+    made before the next number was called, is approved automatically, and
+    the remaining claims for a prize that has been won are rejected. Ties,
+    late claims, claims beaten by another ticket's earlier completion and
+    claims whose pattern is not complete stay pending with a review_reason for the
+    admin. Returns the number of claims settled.
+    """
+    game = get_game(game_id)
+    game.state.refresh()
+    game.winners.sync()
+
+    db = get_db(db)
+    settled = 0
+    with game.claims_lock:
+        try:
+            query = "SELECT * FROM prizes WHERE game_id = ? AND status = 'pending'"
+            params = [game_id]
+            if prize_type:
+                query += " AND prize_type = ?"
+                params.append(prize_type)
+            pending = db.execute(query + " ORDER BY claimed_at ASC, id ASC", params).fetchall()
+            won = {row['prize_type'] for row in db.execute(
+                "SELECT prize_type FROM prizes WHERE game_id = ? AND status = 'approved'", [game_id])}
+
+            by_prize = collections.defaultdict(list)
+            for claim in pending:
+                by_prize[claim['prize_type']].append(claim)
+
+            # Only the claimed tickets are looked up in the index
+            with game.winners.lock:
+                calls = {claim['id']: game.winners.completed_at.get((claim['ticket_code'], claim['prize_type']))
+                         for claim in pending}
+                first_completion = {prize: game.winners.first_completion.get(prize) for prize in by_prize}
+
+            for prize, claims in by_prize.items():
+                late = {claim['id'] for claim in claims
+                        if calls[claim['id']] is not None and claim['claimed_call'] is not None
+                        and claim['claimed_call'] > calls[claim['id']]}
+                reasons = {}
+                winner = None
+                valid = [claim for claim in claims if calls[claim['id']] is not None and claim['id'] not in late]
+
+                if prize in won:
+                    reasons = {claim['id']: 'prize already won' for claim in claims}
+                elif valid:
+                    best = min(calls[claim['id']] for claim in valid)
+                    leaders = [claim for claim in valid if calls[claim['id']] == best]
+                    first_call, first_codes = first_completion[prize]
+                    if len(leaders) == 1 and best == first_call and first_codes == {leaders[0]['ticket_code']}:
+                        winner = leaders[0]
+                    elif best > first_call:
+                        reasons.update({claim['id']: 'another ticket completed this pattern earlier' for claim in leaders})
+                    else:
+                        reasons.update({claim['id']: 'tie' for claim in leaders})
+                for claim in claims:
+                    if calls[claim['id']] is None:
+                        reasons[claim['id']] = 'pattern not complete'
+                    elif winner is not None and claim is not winner:
+                        reasons[claim['id']] = 'prize already won'
+                    elif claim['id'] in late and prize not in won:
+                        reasons[claim['id']] = 'claimed late'
+                    elif claim['id'] not in reasons and claim is not winner:
+                        reasons[claim['id']] = 'completed later'
+
+                # Only rows whose verdict changed are written
+                changed = []
+                for claim in claims:
+                    verdict = (calls[claim['id']], reasons.get(claim['id']))
+                    if (claim['completed_call'], claim['review_reason']) != verdict:
+                        changed.append((*verdict, claim['id']))
+                if changed:
+                    db.executemany('UPDATE prizes SET completed_call = ?, review_reason = ? WHERE id = ?', changed)
+                    db.commit()
+
+                if winner is not None:
+                    success, _ = approve_prize_claim(winner['id'], approved_by='auto', db=db, game_id=game_id)
+                    if not success:
+                        continue
+                    settled += 1
+                if winner is not None or prize in won:
+                    rejected = db.execute(
+                        "UPDATE prizes SET status = 'rejected' WHERE game_id = ? AND prize_type = ? "
+                        "AND status = 'pending' AND review_reason = 'prize already won'",
+                        [game_id, prize]
+                    ).rowcount
+                    db.commit()
+                    settled += rejected
+        finally:
+            db.close()
+    return settled
+
+# QR codes are served as images from /qr/<key>.png (or .svg) instead of
+# being inlined into pages. Rendering only depends on the encoded URL and
+# the image parameters, so the images live in a small LRU keyed by those
+# and the ETag is known before anything is rendered.
+QR_CACHE_SIZE = 256
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+QR_MAX_AGE = 24 * 3600
+QR_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Where the app is reached from outside, for prewarming the register codes;
+# Render sets RENDER_EXTERNAL_URL
+QR_PUBLIC_URL = os.environ.get('PUBLIC_URL') or os.environ.get('RENDER_EXTERNAL_URL')
+
+def render_qr(url, image_format='png', box_size=QR_BOX_SIZE, border=QR_BORDER):
+    """QR code for url as PNG or SVG bytes"""
+    qr = qrcode.QRCode(box_size=box_size, border=border)
+    qr.add_data(url)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    if image_format == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def qr_etag(url, image_format='png', box_size=QR_BOX_SIZE, border=QR_BORDER):
+    return hashlib.blake2b(f'{image_format}|{box_size}|{border}|{url}'.encode(), digest_size=12).hexdigest()
+
+class QRCache:
+    """LRU of rendered QR codes by (url, format, box size, border)"""
+
+    def __init__(self, size=QR_CACHE_SIZE):
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, url, image_format='png', box_size=QR_BOX_SIZE, border=QR_BORDER):
+        """Image bytes, rendered on first use"""
+        key = (url, image_format, box_size, border)
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+                return body
+        body = render_qr(url, image_format, box_size, border)
+        with self.lock:
+            self.entries[key] = body
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return body
+
+qr_cache = QRCache()
+
+def prewarm_qr_codes():
+    """Render every game's register QR code for QR_PUBLIC_URL"""
+    if not QR_PUBLIC_URL:
+        return
+    db = get_db()
+    game_ids = [row['id'] for row in db.execute('SELECT id FROM games ORDER BY id ASC LIMIT ?', [QR_CACHE_SIZE // 2])]
+    db.close()
+    for game_id in game_ids:
+        for image_format in QR_FORMATS:
+            try:
+                qr_cache.get(QR_PUBLIC_URL.rstrip('/') + game_prefix(game_id) + '/register', image_format)
+            except Exception as e:
+                print(f"QR prewarm error: {e}")
+                return
+
+def game_route(rule, **options):
+    """Register a view for the default game at rule and for any game at /g/<game_id>rule.
+
+    The view gets the Game as its first argument; unknown games are a 404.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(game_id=DEFAULT_GAME_ID, **kwargs):
+            game = get_game(game_id)
+            if game is None:
+                abort(404)
+            g.game = game
+            return view(game, **kwargs)
+        app.route(rule, **options)(wrapper)
+        app.route(f'/g/<int:game_id>{rule}', **options)(wrapper)
+        return wrapper
+    return decorator
+
+def versioned(view):
+    """Tag a game view's response with the game version, answering a matching If-None-Match with 304.
+
+    The check only reads memory; the version itself is refreshed from the
+    database at most once per GAME_STATE_SYNC_INTERVAL.
+    """
+    @functools.wraps(view)
+    def wrapper(game, **kwargs):
+        game.state.refresh()
+        etag = game.etag
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = make_response(view(game, **kwargs))
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
 
-@app.route('/')
-def index():
+@app.context_processor
+def inject_game():
+    """Templates prefix their links and fetches with game_prefix"""
+    game = g.get('game')
+    return {'game': game, 'game_prefix': game.prefix if game else ''}
+
+@game_route('/')
+def index(game):
     if 'device_id' not in session:
         session['device_id'] = str(uuid.uuid4())
     
     db = get_db()
-    user = db.execute('SELECT * FROM users WHERE device_id = ?', [session['device_id']]).fetchone()
+    user = db.execute('SELECT * FROM users WHERE game_id = ? AND device_id = ?',
+                      [game.id, session['device_id']]).fetchone()
     db.close()
     
     if user:
-        return redirect('/ticket')
+        return redirect(game.url('/ticket'))
     
-    qr_url = request.url_root + 'register'
-    qr_code = generate_qr(qr_url)
+    qr_url = request.url_root.rstrip('/') + game.url('/register')
+    qr_code = game.url('/qr/register.png')
     
     return render_template('index.html', qr_code=qr_code, qr_url=qr_url)
+
+@game_route('/qr/<key>.<any(png, svg):image_format>')
+def qr_image(game, key, image_format):
+    """QR code of the register page (key `register`) or of a ticket (`ticket-<code>`), for recovery"""
+    if key == 'register':
+        url = request.url_root.rstrip('/') + game.url('/register')
+        cache_control = f'public, max-age={QR_MAX_AGE}'
+    elif key.startswith('ticket-'):
+        ticket_code = key.removeprefix('ticket-')
+        player = player_cache.get(ticket_code)
+        if player is None or player.game_id != game.id:
+            abort(404)
+        url = request.url_root.rstrip('/') + game.url(f'/ticket?code={ticket_code}')
+        cache_control = f'private, max-age={QR_MAX_AGE}'
+    else:
+        abort(404)
+
+    etag = qr_etag(url, image_format)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        try:
+            response = Response(qr_cache.get(url, image_format), mimetype=QR_FORMATS[image_format])
+        except Exception as e:
+            print(f"QR Generation Error: {e}")
+            return "QR code not available", 500
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Host')
+    return response
     
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     return send_from_directory('static', filename)
     
-@app.route('/register', methods=['GET', 'POST'])
-def register():
+@game_route('/register', methods=['GET', 'POST'])
+def register(game):
     if 'device_id' not in session:
         session['device_id'] = str(uuid.uuid4())
     
     db = get_db()
-    user = db.execute('SELECT * FROM users WHERE device_id = ?', [session['device_id']]).fetchone()
+    user = db.execute('SELECT * FROM users WHERE game_id = ? AND device_id = ?',
+                      [game.id, session['device_id']]).fetchone()
     
     if user:
         db.close()
-        return redirect('/ticket')
+        return redirect(game.url('/ticket'))
     
     if request.method == 'POST':
         name = request.form['name'].strip()
+        strip = request.form.get('tickets') == 'strip'
         if name:
-            # Generate unique ticket and code
-            ticket = generate_unique_ticket()
-            ticket_json = json.dumps(ticket)
-            ticket_code = generate_ticket_code()
-            
-            try:
-                db.execute('INSERT INTO users (name, device_id, ticket_code, ticket_data) VALUES (?, ?, ?, ?)',
-                          [name, session['device_id'], ticket_code, ticket_json])
-                db.commit()
-                db.close()
-                
-                # Store ticket code in session for recovery
-                session['ticket_code'] = ticket_code
-                return redirect('/ticket')
-            except sqlite3.IntegrityError:
-                # User already exists, redirect to ticket
-                db.close()
-                return redirect('/ticket')
+            # Take a pre-generated unique ticket and code, or build a full
+            # strip; another worker may have used the same ones meanwhile,
+            # so retry a few times
+            for _ in range(5):
+                if strip:
+                    tickets = generate_ticket_strip()
+                    codes = generate_ticket_codes(len(tickets), db)
+                else:
+                    ticket, ticket_code = ticket_pool.take()
+                    tickets, codes = [ticket], [ticket_code]
+                try:
+                    if len(reserve_tickets(db, tickets)) != len(tickets):
+                        db.rollback()
+                        continue
+                    cursor = db.execute('INSERT INTO users (game_id, name, device_id, ticket_code, ticket_data, numbers_count) VALUES (?, ?, ?, ?, ?, ?)',
+                                        [game.id, name, session['device_id'], codes[0], encode_ticket(tickets[0]), 15 * len(tickets)])
+                    db.executemany('INSERT INTO tickets (game_id, user_id, ticket_code, ticket_data, strip_position) VALUES (?, ?, ?, ?, ?)',
+                                   [(game.id, cursor.lastrowid, code, encode_ticket(ticket), position if strip else None)
+                                    for position, (ticket, code) in enumerate(zip(tickets, codes))])
+                    db.commit()
+                    db.close()
+                    
+                    # Store ticket code in session for recovery
+                    session[game.ticket_session_key] = codes[0]
+                    return redirect(game.url('/ticket'))
+                except sqlite3.IntegrityError:
+                    db.rollback()
+                    if db.execute('SELECT 1 FROM users WHERE game_id = ? AND device_id = ?',
+                                  [game.id, session['device_id']]).fetchone():
+                        # User already exists, redirect to ticket
+                        db.close()
+                        return redirect(game.url('/ticket'))
+            db.close()
+            return render_template('register.html', error='Could not issue a ticket, please try again')
         else:
             db.close()
             return render_template('register.html', error='Please enter your name')
@@ -566,24 +1786,27 @@ def register():
     db.close()
     return render_template('register.html')
 
-@app.route('/ticket')
-def show_ticket():
+@game_route('/ticket')
+def show_ticket(game):
     # Check if user has ticket code in session or URL parameter
-    ticket_code = request.args.get('code') or session.get('ticket_code')
+    ticket_code = request.args.get('code') or session.get(game.ticket_session_key)
     
     if not ticket_code:
-        return redirect('/')
+        return redirect(game.url('/'))
     
-    db = get_db()
-    user = db.execute('SELECT * FROM users WHERE ticket_code = ?', [ticket_code]).fetchone()
-    db.close()
+    # Any ticket code of a player opens all of the player's tickets
+    player = player_cache.get(ticket_code)
     
-    if not user:
+    if not player:
         return render_template('recover.html', error='Invalid ticket code')
     
+    if player.game_id != game.id:
+        # Ticket codes are unique across games; show it in its own game
+        return redirect(game_prefix(player.game_id) + f'/ticket?code={ticket_code}')
+    
     try:
-        ticket = json.loads(user['ticket_data'])
-        total_numbers = count_ticket_numbers(ticket)
+        tickets = player.tickets
+        total_numbers = player.numbers_count
         current_time = datetime.now()
         
         # Get called numbers from session or query parameter
@@ -593,36 +1816,38 @@ def show_ticket():
             called_numbers = [int(num) for num in called_numbers_param.split(',') if num.isdigit()]
             session['called_numbers'] = called_numbers
         
-        # Check completed patterns
-        patterns = check_ticket_patterns(ticket, called_numbers)
+        # Check completed patterns on all tickets in one pass
+        ticket_patterns = check_tickets_patterns(tickets, called_numbers)
         
         # Get user's prize claims
         db = get_db()
         user_prizes = db.execute(
             'SELECT prize_type, status, claimed_at FROM prizes WHERE user_id = ? ORDER BY claimed_at DESC',
-            [user['id']]
+            [player.id]
         ).fetchall()
         
         # Get all approved winners to show on ticket
         approved_winners = db.execute('''
             SELECT prize_type, user_name, ticket_code 
             FROM prizes 
-            WHERE status = "approved" 
+            WHERE game_id = ? AND status = "approved" 
             ORDER BY approved_at DESC
-        ''').fetchall()
+        ''', [game.id]).fetchall()
         db.close()
         
         # Store in session for future access
-        session['device_id'] = user['device_id']
-        session['ticket_code'] = user['ticket_code']
+        session['device_id'] = player.device_id
+        session[game.ticket_session_key] = player.ticket_code
         
         return render_template('ticket.html', 
-                             ticket=ticket, 
-                             user_name=user['name'], 
+                             ticket=tickets[0] if tickets else None, 
+                             tickets=[{'code': ticket.code, 'ticket': ticket, 'patterns': patterns}
+                                      for ticket, patterns in zip(tickets, ticket_patterns)],
+                             user_name=player.name, 
                              total_numbers=total_numbers,
-                             ticket_code=user['ticket_code'],
+                             ticket_code=player.ticket_code,
                              called_numbers=called_numbers,
-                             patterns=patterns,
+                             patterns=ticket_patterns[0] if ticket_patterns else {},
                              user_prizes=user_prizes,
                              approved_winners=approved_winners,
                              now=current_time)
@@ -630,142 +1855,332 @@ def show_ticket():
         print(f"Error loading ticket: {e}")
         return "Error loading ticket. Please register again."
    
-@app.route('/prizes')
-def show_prizes():
+@game_route('/prizes')
+def show_prizes(game):
     """Public page showing all prize claims"""
-    prize_claims = get_prize_claims()
+    prize_claims = get_prize_claims(game_id=game.id)
     return render_template('prizes.html', prize_claims=prize_claims)
     
-@app.route('/recover', methods=['GET', 'POST'])
-def recover_ticket():
+@game_route('/recover', methods=['GET', 'POST'])
+def recover_ticket(game):
     if request.method == 'POST':
         ticket_code = request.form['ticket_code'].strip().upper()
         if ticket_code:
-            return redirect(f'/ticket?code={ticket_code}')
+            return redirect(game.url(f'/ticket?code={ticket_code}'))
         else:
             return render_template('recover.html', error='Please enter your ticket code')
     
     return render_template('recover.html')
     
-@app.route('/admin/export')
-def export_data():
-    """Export user data as JSON"""
+# /admin/export streams players from one cursor in the chosen format, so
+# memory stays flat however many players there are. ?since=<id> resumes
+# after the player id an earlier export returned in X-Export-Cursor.
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'binary': ('application/octet-stream', 'tmbx'),
+}
+EXPORT_CHUNK_SIZE = 64 * 1024
+# Binary export: magic and version, then per player
+#   <I id> <I created_at (unix time)> <B ticket count>
+#   <H name length> name <B device id length> device id
+# and per ticket <B code length> code <B strip position, 255 if none> 15-byte ticket
+EXPORT_MAGIC = b'TMBX\x01'
+EXPORT_CSV_HEADER = ['user_id', 'name', 'device_id', 'created_at', 'ticket_code', 'strip_position', 'numbers']
+
+def export_players(game_id, since=0, until=None, db=None):
+    """(player row, [ticket rows]) in id order, read from a single cursor"""
+    db = get_db(db)
+    try:
+        rows = db.execute('''
+            SELECT u.id, u.name, u.device_id, u.created_at,
+                   CAST(strftime('%s', u.created_at) AS INTEGER) AS created_ts,
+                   t.ticket_code, t.ticket_data, t.strip_position
+            FROM users u
+            JOIN tickets t ON t.user_id = u.id
+            WHERE u.game_id = ? AND u.id > ? AND u.id <= ?
+            ORDER BY u.id, t.id
+        ''', [game_id, since, until if until is not None else since])
+        for _, group in itertools.groupby(rows, key=lambda row: row['id']):
+            tickets = list(group)
+            yield tickets[0], tickets
+    finally:
+        db.close()
+
+def export_record(player, tickets):
+    tickets = [{'ticket_code': row['ticket_code'], 'ticket_data': load_ticket(row['ticket_data'])}
+               for row in tickets]
+    return {
+        'id': player['id'],
+        'name': player['name'],
+        'ticket_code': tickets[0]['ticket_code'],
+        'device_id': player['device_id'],
+        'created_at': player['created_at'],
+        'ticket_data': tickets[0]['ticket_data'],
+        'tickets': tickets
+    }
+
+def export_binary_record(player, tickets):
+    name = player['name'].encode()[:0xFFFF]
+    device_id = player['device_id'].encode()[:0xFF]
+    data = bytearray(struct.pack('<IIBH', player['id'], player['created_ts'] or 0, len(tickets), len(name)))
+    data += name + bytes([len(device_id)]) + device_id
+    for row in tickets:
+        code = row['ticket_code'].encode()
+        position = row['strip_position']
+        data += bytes([len(code)]) + code + bytes([255 if position is None else position])
+        ticket_data = row['ticket_data']
+        data += ticket_data if isinstance(ticket_data, bytes) else encode_ticket(load_ticket(ticket_data))
+    return bytes(data)
+
+def export_chunks(players, export_format):
+    """Encoded export, in pieces of about EXPORT_CHUNK_SIZE bytes"""
+    buffer = io.BytesIO()
+    if export_format == 'json':
+        buffer.write(b'[')
+    elif export_format == 'binary':
+        buffer.write(EXPORT_MAGIC)
+    elif export_format == 'csv':
+        text = io.TextIOWrapper(buffer, encoding='utf-8', newline='', write_through=True)
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_CSV_HEADER)
+    first = True
+    for player, tickets in players:
+        if export_format == 'json':
+            buffer.write((',\n' if not first else '\n').encode() + json.dumps(export_record(player, tickets)).encode())
+        elif export_format == 'ndjson':
+            buffer.write(json.dumps(export_record(player, tickets)).encode() + b'\n')
+        elif export_format == 'csv':
+            for row in tickets:
+                ticket = load_ticket(row['ticket_data'])
+                writer.writerow([player['id'], player['name'], player['device_id'], player['created_at'],
+                                 row['ticket_code'], '' if row['strip_position'] is None else row['strip_position'],
+                                 ' '.join(str(num) for line in ticket for num in line if num)])
+        else:
+            buffer.write(export_binary_record(player, tickets))
+        first = False
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if export_format == 'json':
+        buffer.write(b'\n]\n')
+    yield buffer.getvalue()
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@game_route('/admin/export')
+def export_data(game):
+    """Export players and their tickets as json, ndjson, csv or binary (?format=)"""
+    export_format = request.args.get('format', 'json')
+    since = request.args.get('since', '0')
+    if export_format not in EXPORT_FORMATS or not since.isdigit():
+        return jsonify({'error': 'Invalid format or since'}), 400
+    since = int(since)
+
+    # Players registering during the export wait for the next one
     db = get_db()
-    users = db.execute('SELECT * FROM users ORDER BY created_at DESC').fetchall()
+    until = db.execute('SELECT MAX(id) FROM users WHERE game_id = ?', [game.id]).fetchone()[0] or since
     db.close()
-    
-    export_data = []
-    for user in users:
-        try:
-            ticket_data = json.loads(user['ticket_data'])
-            export_data.append({
-                'name': user['name'],
-                'ticket_code': user['ticket_code'],
-                'device_id': user['device_id'],
-                'created_at': user['created_at'],
-                'ticket_data': ticket_data
-            })
-        except:
-            continue
-    
-    return json.dumps(export_data, indent=2)
-    
-@app.route('/admin')
-def admin():
+
+    chunks = export_chunks(export_players(game.id, since, until), export_format)
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    headers = {
+        'Content-Disposition': f'attachment; filename=tambola-game{game.id}-{since}-{until}.{extension}',
+        'X-Export-Cursor': str(max(since, until)),
+        'Cache-Control': 'no-store',
+        'Vary': 'Accept-Encoding',
+    }
+    if 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(chunks, mimetype=mimetype, headers=headers)
+
+# Admin lists are keyset-paginated: a page holds up to `limit` rows and the
+# cursor of the next one, so no page costs more than its own rows.
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 500
+CLAIM_STATUSES = ('pending', 'approved', 'rejected')
+
+def get_game_counters(game_id=DEFAULT_GAME_ID, db=None):
+    """Player and ticket counts of a game, maintained by triggers"""
+    db = get_db(db)
+    row = db.execute('SELECT users_count, tickets_count FROM games WHERE id = ?', [game_id]).fetchone()
+    db.close()
+    return {'users': row['users_count'], 'tickets': row['tickets_count']} if row else {'users': 0, 'tickets': 0}
+
+def fts_query(text):
+    """Prefix match on every word of text, quoted so input is never FTS syntax"""
+    words = [word.replace('"', '') for word in text.split()]
+    return ' '.join(f'"{word}"*' for word in words if word)
+
+def get_users_page(game_id=DEFAULT_GAME_ID, cursor=None, limit=ADMIN_PAGE_SIZE, search=None, db=None):
+    """Players of a game, newest first, optionally matching a name or ticket code.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    conditions, params = ['game_id = ?'], [game_id]
+    if cursor is not None:
+        conditions.append('id < ?')
+        params.append(cursor)
+    db = get_db(db)
     try:
-        db = get_db()
-        
-        # Get all users with their tickets
-        users = db.execute('SELECT * FROM users ORDER BY created_at DESC').fetchall()
-        
-        # Get statistics with error handling
-        try:
-            total_tickets = db.execute('SELECT COUNT(*) as count FROM used_tickets').fetchone()['count']
-        except:
-            total_tickets = 0
-            
-        try:
-            total_users = db.execute('SELECT COUNT(*) as count FROM users').fetchone()['count']
-        except:
-            total_users = 0
-        
-        # Get prize claims with error handling
-        pending_claims = []
-        approved_claims = []
-        
-        try:
-            pending_claims = db.execute('''
-                SELECT p.*, u.name 
-                FROM prizes p 
-                JOIN users u ON p.user_id = u.id 
-                WHERE p.status = "pending"
-                ORDER BY p.claimed_at ASC
-            ''').fetchall()
-        except Exception as e:
-            print(f"Error getting pending claims: {e}")
-        
-        try:
-            approved_claims = db.execute('''
-                SELECT p.*, u.name 
-                FROM prizes p 
-                JOIN users u ON p.user_id = u.id 
-                WHERE p.status = "approved"
-                ORDER BY p.approved_at DESC
-            ''').fetchall()
-        except Exception as e:
-            print(f"Error getting approved claims: {e}")
-        
-        db.close()
-        
-        user_list = []
-        for user in users:
+        if search and search.strip():
+            search = search.strip()
             try:
-                ticket_data = json.loads(user['ticket_data'])
-                user_list.append({
-                    'id': user['id'],
-                    'name': user['name'],
-                    'ticket': ticket_data,
-                    'ticket_code': user['ticket_code'],
-                    'device_id': user['device_id'],
-                    'created_at': user['created_at'],
-                    'numbers_count': count_ticket_numbers(ticket_data),
-                    'ticket_url': f"/ticket?code={user['ticket_code']}"
-                })
-            except Exception as e:
-                print(f"Error processing user {user['id']}: {e}")
-                continue
-        
+                rows = db.execute(f'''
+                    SELECT * FROM users
+                    WHERE id IN (SELECT rowid FROM users_fts WHERE users_fts MATCH ?
+                                 UNION SELECT user_id FROM tickets WHERE ticket_code = ?)
+                      AND {' AND '.join(conditions)}
+                    ORDER BY id DESC LIMIT ?
+                ''', [fts_query(search), search.upper(), *params, limit + 1]).fetchall()
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5
+                rows = db.execute(f'''
+                    SELECT * FROM users
+                    WHERE (name LIKE ? OR id IN (SELECT user_id FROM tickets WHERE ticket_code = ?))
+                      AND {' AND '.join(conditions)}
+                    ORDER BY id DESC LIMIT ?
+                ''', [f'%{search}%', search.upper(), *params, limit + 1]).fetchall()
+        else:
+            rows = db.execute(f"SELECT * FROM users WHERE {' AND '.join(conditions)} ORDER BY id DESC LIMIT ?",
+                              [*params, limit + 1]).fetchall()
+    finally:
+        db.close()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]['id']
+    return rows, None
+
+def get_claims_page(game_id=DEFAULT_GAME_ID, status='pending', cursor=None, limit=ADMIN_PAGE_SIZE, db=None):
+    """Prize claims of a game with one status in review order; returns (rows, next_cursor).
+
+    Claims are ordered by the call that completed their pattern, then by
+    claim time (idx_prizes_status_completed). The cursor is the id of the
+    last claim shown, and the page continues after that claim's position;
+    unverified claims (no completed_call) sort first.
+    """
+    conditions, params = ['p.game_id = ?', 'p.status = ?'], [game_id, status]
+    db = get_db(db)
+    try:
+        if cursor is not None:
+            after = db.execute('SELECT completed_call, claimed_at FROM prizes WHERE id = ?', [cursor]).fetchone()
+            if after is None:
+                return [], None
+            if after['completed_call'] is None:
+                conditions.append('(p.completed_call IS NOT NULL OR (p.claimed_at, p.id) > (?, ?))')
+                params += [after['claimed_at'], cursor]
+            else:
+                conditions.append('(p.completed_call, p.claimed_at, p.id) > (?, ?, ?)')
+                params += [after['completed_call'], after['claimed_at'], cursor]
+        rows = db.execute(f'''
+            SELECT p.*, u.name
+            FROM prizes p
+            JOIN users u ON p.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY p.completed_call ASC, p.claimed_at ASC, p.id ASC LIMIT ?
+        ''', [*params, limit + 1]).fetchall()
+    finally:
+        db.close()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]['id']
+    return rows, None
+
+def page_args():
+    """(cursor, limit) from the query string, or None if they are malformed"""
+    cursor = request.args.get('cursor', type=int)
+    limit = request.args.get('limit', ADMIN_PAGE_SIZE, type=int)
+    if ('cursor' in request.args and cursor is None) or limit is None or not 1 <= limit <= ADMIN_MAX_PAGE_SIZE:
+        return None
+    return cursor, limit
+
+@game_route('/admin/api/users')
+def admin_users_api(game):
+    """A page of players; ?q= searches names and ticket codes"""
+    args = page_args()
+    if args is None:
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+    rows, next_cursor = get_users_page(game.id, *args, search=request.args.get('q'))
+    return jsonify({
+        'users': [{
+            'id': user['id'],
+            'name': user['name'],
+            'ticket_code': user['ticket_code'],
+            'device_id': user['device_id'],
+            'created_at': user['created_at'],
+            'numbers_count': user_numbers_count(user),
+            'ticket_url': game.url(f"/ticket?code={user['ticket_code']}")
+        } for user in rows],
+        'next_cursor': next_cursor
+    })
+
+@game_route('/admin/api/users/<int:user_id>/tickets')
+def admin_user_tickets_api(game, user_id):
+    """A player's tickets, fetched when the admin opens them"""
+    db = get_db()
+    rows = db.execute('SELECT ticket_code, ticket_data FROM tickets WHERE user_id = ? AND game_id = ? ORDER BY id ASC',
+                      [user_id, game.id]).fetchall()
+    db.close()
+    return jsonify({'tickets': [{'ticket_code': row['ticket_code'], 'ticket': load_ticket(row['ticket_data'])}
+                                for row in rows]})
+
+@game_route('/admin/api/claims')
+def admin_claims_api(game):
+    """A page of prize claims with ?status=pending|approved|rejected"""
+    args = page_args()
+    status = request.args.get('status', 'pending')
+    if args is None or status not in CLAIM_STATUSES:
+        return jsonify({'error': 'Invalid cursor, limit or status'}), 400
+    rows, next_cursor = get_claims_page(game.id, status, *args)
+    return jsonify({'claims': [dict(row) for row in rows], 'next_cursor': next_cursor})
+
+@game_route('/admin')
+def admin(game):
+    try:
+        counters = get_game_counters(game.id)
+
+        # Players are listed by the page itself, a page at a time from /admin/api/users
+        pending_claims, pending_cursor = get_claims_page(game.id, 'pending')
+        approved_claims = get_approved_claims(game_id=game.id)
+
         # Show admin message if any
         admin_message = session.pop('admin_message', None)
         admin_success = session.pop('admin_success', None)
-        
-        return render_template('admin.html', 
-                             users=user_list, 
-                             total_tickets=total_tickets,
-                             total_users=total_users,
+
+        return render_template('admin.html',
+                             total_tickets=counters['tickets'],
+                             total_users=counters['users'],
                              pending_claims=pending_claims,
+                             pending_cursor=pending_cursor,
                              approved_claims=approved_claims,
                              admin_message=admin_message,
                              admin_success=admin_success)
-                             
+
     except Exception as e:
         print(f"Admin page error: {e}")
         return f"Error loading admin page: {str(e)}", 500
 
-def check_prize_claim(ticket_code, prize_type):
-    """Check if a prize type has already been approved"""
-    db = get_db()
+def check_prize_claim(ticket_code, prize_type, db=None, game_id=DEFAULT_GAME_ID):
+    """Check if a prize type has already been approved in a game"""
+    db = get_db(db)
     existing = db.execute(
-        'SELECT * FROM prizes WHERE prize_type = ? AND status = "approved"', 
-        [prize_type]
+        'SELECT * FROM prizes WHERE game_id = ? AND prize_type = ? AND status = "approved"', 
+        [game_id, prize_type]
     ).fetchone()
     db.close()
     return existing is not None
 
-@app.route('/claim_prize', methods=['POST'])
-def claim_prize_route():
+@game_route('/claim_prize', methods=['POST'])
+def claim_prize_route(game):
     if 'device_id' not in session:
-        return redirect('/')
+        return redirect(game.url('/'))
     
     ticket_code = request.form.get('ticket_code')
     prize_type = request.form.get('prize_type')
@@ -773,80 +2188,112 @@ def claim_prize_route():
     if not ticket_code or not prize_type:
         session['claim_message'] = "Missing ticket code or prize type"
         session['claim_success'] = False
-        return redirect(f'/ticket?code={session.get("ticket_code", "")}')
+        return redirect(game.url(f'/ticket?code={session.get(game.ticket_session_key, "")}'))
     
-    db = get_db()
-    user = db.execute('SELECT * FROM users WHERE ticket_code = ? AND device_id = ?', 
-                     [ticket_code, session['device_id']]).fetchone()
+    player = player_cache.get(ticket_code)
     
-    if not user:
-        db.close()
+    if not player or player.game_id != game.id or player.device_id != session['device_id']:
         session['claim_message'] = "User not found"
         session['claim_success'] = False
-        return redirect(f'/ticket?code={session.get("ticket_code", "")}')
+        return redirect(game.url(f'/ticket?code={session.get(game.ticket_session_key, "")}'))
     
     # Check if pattern is actually completed
-    called_numbers = get_called_numbers()
-    ticket = json.loads(user['ticket_data'])
-    patterns = check_ticket_patterns(ticket, called_numbers)
+    game.state.refresh()
+    patterns = player.ticket(ticket_code).patterns(game.state.called_mask)
     
     if not patterns.get(prize_type):
-        db.close()
         session['claim_message'] = f"Pattern {prize_type.replace('_', ' ')} not completed yet!"
         session['claim_success'] = False
-        return redirect(f'/ticket?code={ticket_code}')
+        return redirect(game.url(f'/ticket?code={ticket_code}'))
     
-    success, message = claim_prize(user['id'], ticket_code, prize_type, user['name'])
+    db = get_db()
+    success, message = claim_prize(player.id, ticket_code, prize_type, player.name, db)
+    if success:
+        process_pending_claims(prize_type, db, game_id=game.id)
     db.close()
     
     session['claim_message'] = message
     session['claim_success'] = success
     
-    return redirect(f'/ticket?code={ticket_code}')
+    return redirect(game.url(f'/ticket?code={ticket_code}'))
+
+@game_route('/admin/winners')
+def winners_route(game):
+    """Tickets that have completed each pattern, in call order"""
+    game.state.refresh()
+    with game.winners.lock:
+        game.winners.sync()
+        completions = list(game.winners.completions)
+        total_called = len(game.winners.applied)
+    return jsonify({
+        'total_called': total_called,
+        'winners': [{'ticket_code': code, 'pattern': pattern, 'call_index': call_index}
+                    for code, pattern, call_index in completions]
+    })
+
+@game_route('/admin/process_claims')
+def process_claims_route(game):
+    """Re-verify all pending claims and settle the clear-cut ones"""
+    settled = process_pending_claims(game_id=game.id)
+    session['admin_message'] = f"Verified pending claims, {settled} settled automatically"
+    session['admin_success'] = True
+    return redirect(game.url('/admin'))
+
+def claim_exists(claim_id, game_id=DEFAULT_GAME_ID, db=None):
+    """Whether claim_id is a claim of this game"""
+    db = get_db(db)
+    row = db.execute('SELECT 1 FROM prizes WHERE id = ? AND game_id = ?', [claim_id, game_id]).fetchone()
+    db.close()
+    return row is not None
 
-@app.route('/admin/approve_claim/<int:claim_id>')
-def approve_claim(claim_id):
+@game_route('/admin/approve_claim/<int:claim_id>')
+def approve_claim(game, claim_id):
     """Admin route to approve a prize claim"""
+    if not claim_exists(claim_id, game.id):
+        abort(404)
     try:
-        success, message = approve_prize_claim(claim_id)
+        success, message = approve_prize_claim(claim_id, game_id=game.id)
         session['admin_message'] = message
         session['admin_success'] = success
     except Exception as e:
         session['admin_message'] = f"Error approving claim: {str(e)}"
         session['admin_success'] = False
-    return redirect('/admin')
+    return redirect(game.url('/admin'))
 
-@app.route('/admin/reject_claim/<int:claim_id>')
-def reject_claim(claim_id):
+@game_route('/admin/reject_claim/<int:claim_id>')
+def reject_claim(game, claim_id):
     """Admin route to reject a prize claim"""
+    if not claim_exists(claim_id, game.id):
+        abort(404)
     try:
-        success, message = reject_prize_claim(claim_id)
+        success, message = reject_prize_claim(claim_id, game_id=game.id)
         session['admin_message'] = message
         session['admin_success'] = success
     except Exception as e:
         session['admin_message'] = f"Error rejecting claim: {str(e)}"
         session['admin_success'] = False
-    return redirect('/admin')
+    return redirect(game.url('/admin'))
 
-@app.route('/admin/clear_claims')
-def clear_claims():
-    """Clear all prize claims (for testing)"""
+@game_route('/admin/clear_claims')
+def clear_claims(game):
+    """Clear all prize claims of the game (for testing)"""
     db = get_db()
-    db.execute('DELETE FROM prizes')
+    db.execute('DELETE FROM prizes WHERE game_id = ?', [game.id])
     db.commit()
     db.close()
     session['admin_message'] = "All claims cleared!"
-    return redirect('/admin')
+    return redirect(game.url('/admin'))
     
-@app.route('/stats')
-def stats():
+@game_route('/stats')
+def stats(game):
+    counters = get_game_counters(game.id)
     db = get_db()
-    total_users = db.execute('SELECT COUNT(*) as count FROM users').fetchone()['count']
     total_unique_tickets = db.execute('SELECT COUNT(*) as count FROM used_tickets').fetchone()['count']
     db.close()
     
     return {
-        'total_users': total_users,
+        'total_users': counters['users'],
+        'total_tickets': counters['tickets'],
         'unique_tickets_generated': total_unique_tickets
     }
     
@@ -880,10 +2327,15 @@ def reset_database():
     c.execute('DROP TABLE IF EXISTS prizes')
     c.execute('DROP TABLE IF EXISTS used_tickets')
     c.execute('DROP TABLE IF EXISTS users')
+    c.execute('DROP TABLE IF EXISTS tickets')
+    c.execute('PRAGMA user_version = 0')  # rerun migrations on the fresh tables
     conn.commit()
     conn.close()
     
     init_db()
+    with games_lock:
+        games.clear()
+    player_cache.clear()
     return "Database reset successfully"
     
 @app.route('/admin/fix-db')
@@ -936,10 +2388,10 @@ def fix_database():
         return "Database fixed successfully!"
     except Exception as e:
         return f"Error fixing database: {str(e)}"
-@app.route('/caller')
-def caller_dashboard():
+@game_route('/caller')
+def caller_dashboard(game):
     """Number caller dashboard"""
-    called_numbers = get_called_numbers()
+    called_numbers = get_called_numbers(game.id)
     recent_numbers = called_numbers[-10:]  # Last 10 numbers
     return render_template('caller.html', 
                          called_numbers=called_numbers,
@@ -948,65 +2400,100 @@ def caller_dashboard():
                          remaining=90 - len(called_numbers))
 
 
-@app.route('/reset_numbers', methods=['POST'])
-def reset_numbers_route():
+@game_route('/reset_numbers', methods=['POST'])
+def reset_numbers_route(game):
     """Reset all called numbers"""
-    if reset_called_numbers():
+    if reset_called_numbers(game.id):
         return jsonify({'success': True, 'message': 'All numbers reset!'})
     else:
         return jsonify({'success': False, 'message': 'Error resetting numbers'})
         
-def call_number(manual_number=None):
-    """Call a number - either manual or random"""
+def call_number(manual_number=None, game_id=DEFAULT_GAME_ID, auto_call_owner=None):
+    """Call a number in a game - either manual or random.
+
+    The auto-caller passes its lease token as auto_call_owner; the call is
+    then only made if that lease still holds when the write lock is taken,
+    so a stop from any worker is never followed by another call.
+    """
+    game = get_game(game_id)
+    if game is None:
+        return None, f"Game {game_id} not found"
+    db = get_db()
     try:
-        db = get_db()
-        
-        # Get already called numbers
-        called_numbers = get_called_numbers()
-        
-        # If all numbers are called, return message
-        if len(called_numbers) >= 90:
-            db.close()
-            return None, "🎉 All numbers have been called! Game complete!"
-        
-        if manual_number is not None:
-            # Manual call - validate number
-            if manual_number < 1 or manual_number > 90:
-                db.close()
-                return None, "Please enter a number between 1 and 90"
+        with game.state.lock:
+            # Take the write lock first so no other worker can call in between
+            begin_immediate(db)
+            game.state.refresh(db, force=True)
+            total_called = game.state.total_called()
             
-            if manual_number in called_numbers:
-                db.close()
-                return None, f"Number {manual_number} has already been called!"
+            if auto_call_owner is not None and not db.execute(
+                    'SELECT 1 FROM auto_call WHERE game_id = ? AND enabled = 1 AND owner = ?',
+                    [game.id, auto_call_owner]).fetchone():
+                db.rollback()
+                return None, "Auto-call is not running"
             
-            number = manual_number
-        else:
-            # Auto call - get random uncalled number
-            available_numbers = [n for n in range(1, 91) if n not in called_numbers]
-            if not available_numbers:
-                db.close()
-                return None, "No numbers available to call!"
+            # If all numbers are called, return message
+            if total_called >= 90:
+                db.rollback()
+                return None, "🎉 All numbers have been called! Game complete!"
+            
+            if manual_number is not None:
+                # Manual call - validate number
+                if manual_number < 1 or manual_number > 90:
+                    db.rollback()
+                    return None, "Please enter a number between 1 and 90"
+                
+                if game.state.is_called(manual_number):
+                    db.rollback()
+                    return None, f"Number {manual_number} has already been called!"
+                
+                number = manual_number
+            else:
+                # Auto call - get random uncalled number
+                number = game.state.draw()
+                if number is None:
+                    db.rollback()
+                    return None, "No numbers available to call!"
             
-            number = random.choice(available_numbers)
+            # Record the called number
+            cursor = db.execute(
+                'INSERT INTO called_numbers (game_id, number, called_by) VALUES (?, ?, ?)',
+                [game.id, number, 'system' if manual_number is None else 'manual']
+            )
+            version = bump_game_version(db, game.id)
+            record_event(db, game.id, 'number', {
+                'number': number,
+                'number_text': get_number_text(number),
+                'total_called': total_called + 1
+            })
+            db.commit()
+            game.state.add(number, cursor.lastrowid)
+            game.state.set_version(version)
         
-        # Record the called number
-        db.execute(
-            'INSERT INTO called_numbers (number, called_by) VALUES (?, ?)',
-            [number, 'system' if manual_number is None else 'manual']
-        )
-        db.commit()
-        db.close()
+        # Outside the state lock. Until the index is built at game load the
+        # build itself counts this call, without an event
+        completed = game.winners.sync() if game.winners.ready else []
+        if completed:
+            # Counts only; /admin/winners has the ticket codes
+            record_event(db, game.id, 'winners', {
+                'number': number,
+                'completed': collections.Counter(pattern for _, pattern, _ in completed)
+            })
+            db.commit()
+        game.events.sync(force=True)
         
         return number, f"Number {number} called successfully!"
         
     except Exception as e:
         print(f"Error in call_number: {e}")
         return None, f"Error calling number: {str(e)}"
+    finally:
+        db.close()
         
-@app.route('/fullscreen-caller')
-def fullscreen_caller():
+@game_route('/fullscreen-caller')
+def fullscreen_caller(game):
     """Full screen number caller display"""
-    called_numbers = get_called_numbers()
+    called_numbers = get_called_numbers(game.id)
     recent_numbers = called_numbers[-5:] if called_numbers else []
     
     return render_template('fullscreen_caller.html',
@@ -1015,38 +2502,472 @@ def fullscreen_caller():
                          total_called=len(called_numbers),
                          remaining=90 - len(called_numbers))
     
-@app.route('/last_number')
-def get_last_number():
+@game_route('/last_number')
+@versioned
+def get_last_number(game):
     """Get the last called number"""
-    db = get_db()
-    last = db.execute(
-        'SELECT number FROM called_numbers ORDER BY called_at DESC LIMIT 1'
-    ).fetchone()
-    db.close()
+    game.state.refresh()
+    last = game.state.last_number()
     
     if last:
-        number_text = get_number_text(last['number'])
+        number_text = get_number_text(last)
         return jsonify({
-            'number': last['number'],
+            'number': last,
             'number_text': number_text
         })
     else:
         return jsonify({'number': None})
 ALL_TAMBOLA_NUMBERS = list(range(1, 91))
+GAME_STATE_SYNC_INTERVAL = 1  # seconds between checks for other workers' calls
 
-def get_called_numbers():
-    """Get all called numbers in order"""
-    db = get_db()
-    numbers = db.execute(
-        'SELECT number FROM called_numbers ORDER BY called_at ASC'
-    ).fetchall()
-    db.close()
-    return [row['number'] for row in numbers]
-    
-@app.route('/dashboard')
-def number_dashboard():
+class GameState:
+    """In-memory copy of one game's called-number sequence.
+
+    called_numbers stays the source of truth: calls write through to it and
+    the state is rebuilt from it when the game is loaded. Reads are served
+    from memory; other workers' changes are picked up by comparing the
+    game's version at most once per GAME_STATE_SYNC_INTERVAL.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.lock = threading.RLock()
+        self.version = 0  # games.version this state reflects; survives reset()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.sequence = []
+            self.calls = []  # (called_numbers row id, number) in call order
+            self.called_mask = 0  # bit n is set once number n is called
+            self.pool = list(ALL_TAMBOLA_NUMBERS)
+            self.positions = {number: i for i, number in enumerate(self.pool)}
+            self.last_row_id = 0
+            self.last_check = time.monotonic()
+
+    def load(self, db=None):
+        """Rebuild the state from the called_numbers table"""
+        db = get_db(db)
+        # Version first: a call landing in between only makes us reload again
+        version = self.stored_version(db)
+        rows = db.execute('SELECT id, number FROM called_numbers WHERE game_id = ? ORDER BY id ASC',
+                          [self.game_id]).fetchall()
+        db.close()
+        # Built aside and swapped in at once: snapshot() and calls_since()
+        # read without the lock and must never see a half-built sequence
+        sequence = []
+        calls = []
+        called_mask = 0
+        last_row_id = 0
+        for row in rows:
+            number = row['number']
+            if called_mask >> number & 1:
+                continue
+            sequence.append(number)
+            calls.append((row['id'], number))
+            called_mask |= 1 << number
+            last_row_id = max(last_row_id, row['id'])
+        pool = [number for number in ALL_TAMBOLA_NUMBERS if not called_mask >> number & 1]
+        positions = {number: i for i, number in enumerate(pool)}
+        with self.lock:
+            (self.sequence, self.calls, self.called_mask, self.pool, self.positions,
+             self.last_row_id, self.last_check) = (sequence, calls, called_mask, pool, positions,
+                                                   last_row_id, time.monotonic())
+            self.version = version
+
+    def stored_version(self, db):
+        row = db.execute('SELECT version FROM games WHERE id = ?', [self.game_id]).fetchone()
+        return row['version'] if row else 0
+
+    def is_stale(self, db):
+        return self.stored_version(db) != self.version
+
+    def set_version(self, version):
+        """Record a version this process just committed"""
+        with self.lock:
+            self.version = max(self.version, version)
+
+    def refresh(self, db=None, force=False):
+        """Reload if another worker has called or reset numbers since we last looked"""
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_check < GAME_STATE_SYNC_INTERVAL:
+                return
+            self.last_check = now
+            db = get_db(db)
+            try:
+                if self.is_stale(db):
+                    self.load(db)
+            finally:
+                db.close()
+
+    def add(self, number, row_id=0):
+        """Record a called number; O(1)"""
+        with self.lock:
+            if self.is_called(number):
+                return
+            i = self.positions.pop(number)
+            last = self.pool.pop()
+            if last != number:
+                self.pool[i] = last
+                self.positions[last] = i
+            self.sequence.append(number)
+            self.calls.append((row_id, number))
+            self.called_mask |= 1 << number
+            self.last_row_id = max(self.last_row_id, row_id)
+
+    def draw(self):
+        """Pick a random uncalled number without recording it"""
+        with self.lock:
+            return random.choice(self.pool) if self.pool else None
+
+    def is_called(self, number):
+        return bool(self.called_mask >> number & 1)
+
+    def called_numbers(self):
+        with self.lock:
+            return list(self.sequence)
+
+    def snapshot(self):
+        """Called numbers without taking the lock, for callers that must never block.
+
+        Calls only append to sequence and reset() and load() swap in a new
+        list, so a copy taken under the GIL is always a prefix of the real
+        sequence.
+        """
+        return list(self.sequence)
+
+    def calls_since(self, seq):
+        """Numbers called after the call with row id seq: (new seq, numbers, reset).
+
+        Lock-free like snapshot(). A seq this state does not hold (0, or one
+        from before a reset) gets the whole sequence back with reset set.
+        """
+        calls = self.calls
+        end = len(calls)
+        last = calls[end - 1][0] if end else 0
+        if seq == last:
+            return last, [], False
+        i = bisect.bisect_left(calls, seq, hi=end, key=lambda call: call[0])
+        if seq and i < end and calls[i][0] == seq:
+            return last, [number for _, number in calls[i + 1:end]], False
+        return last, [number for _, number in calls[:end]], True
+
+    def last_number(self):
+        with self.lock:
+            return self.sequence[-1] if self.sequence else None
+
+    def total_called(self):
+        return len(self.sequence)
+
+# Auto-calling. The enabled flag, the interval and a lease naming the one
+# scheduler allowed to call live in the auto_call table, so every worker
+# agrees on them. Each worker that has loaded an auto-called game runs a
+# scheduler thread; the lease holder calls and the others stand by to take
+# over if it goes away.
+AUTO_CALL_INTERVAL = 10       # default seconds between calls
+AUTO_CALL_MIN_INTERVAL = 5
+AUTO_CALL_MAX_INTERVAL = 60
+AUTO_CALL_LEASE = 5           # seconds a scheduler keeps a game without renewing
+AUTO_CALL_POLL = 1            # seconds between checks of the shared settings
+
+class AutoCaller:
+    """Deadline-based auto-call scheduler for one game.
+
+    Calls are due at fixed multiples of the interval on the monotonic
+    clock, so call latency does not add up into drift. The interval is
+    read before every tick, and stop() wakes the thread at once.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+
+    def settings(self, db=None):
+        db = get_db(db)
+        row = db.execute('SELECT enabled, interval, owner, lease_until FROM auto_call WHERE game_id = ?',
+                         [self.game.id]).fetchone()
+        db.close()
+        return row
+
+    @property
+    def enabled(self):
+        row = self.settings()
+        return bool(row and row['enabled'])
+
+    @property
+    def interval(self):
+        row = self.settings()
+        return row['interval'] if row else AUTO_CALL_INTERVAL
+
+    def start(self):
+        db = get_db()
+        try:
+            begin_immediate(db)
+            row = self.settings(db)
+            running = bool(row and row['enabled'])
+            if not running:
+                db.execute('''INSERT INTO auto_call (game_id, enabled, interval) VALUES (?, 1, ?)
+                              ON CONFLICT(game_id) DO UPDATE SET enabled = 1, owner = NULL, lease_until = 0''',
+                           [self.game.id, AUTO_CALL_INTERVAL])
+            db.commit()
+        finally:
+            db.close()
+        self.run_thread()
+        if running:
+            return False, "Auto-call is already running!"
+        return True, "Auto-call started!"
+
+    def stop(self):
+        db = get_db()
+        db.execute('UPDATE auto_call SET enabled = 0, owner = NULL, lease_until = 0 WHERE game_id = ?',
+                   [self.game.id])
+        db.commit()
+        db.close()
+        with self.lock:
+            self.stop_event.set()
+            self.wakeup.set()
+        return True, "Auto-call stopped!"
+
+    def set_interval(self, interval):
+        db = get_db()
+        db.execute('''INSERT INTO auto_call (game_id, interval) VALUES (?, ?)
+                      ON CONFLICT(game_id) DO UPDATE SET interval = excluded.interval''',
+                   [self.game.id, interval])
+        db.commit()
+        db.close()
+        self.wakeup.set()
+
+    def resume(self):
+        """Join the scheduling of a game that is already auto-calling"""
+        if self.enabled:
+            self.run_thread()
+
+    def run_thread(self):
+        """Start this process's scheduler thread unless one is running"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set():
+                self.wakeup.set()
+                return
+            # A stopping thread keeps its own event and lease token, so it
+            # can never call again once a new thread takes over
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self.run, args=(self.stop_event,), daemon=True)
+            self.thread.start()
+
+    def acquire_lease(self, token):
+        """Take or renew the lease; returns (owned, interval, taken_over), or None once disabled.
+
+        Only the holder writes, and only once half its lease has run out;
+        the other workers just read until the lease expires. taken_over is
+        set when the lease came from another scheduler that went away.
+        """
+        db = get_db()
+        try:
+            row = self.settings(db)
+            if not row or not row['enabled']:
+                return None
+            now = time.time()
+            if row['owner'] == token and row['lease_until'] - now > AUTO_CALL_LEASE / 2:
+                return True, row['interval'], False
+            if row['owner'] not in (None, token) and row['lease_until'] >= now:
+                return False, row['interval'], False
+            owned = db.execute('''UPDATE auto_call SET owner = ?, lease_until = ?
+                                  WHERE game_id = ? AND enabled = 1
+                                  AND (owner IS NULL OR owner = ? OR lease_until < ?)''',
+                               [token, now + AUTO_CALL_LEASE, self.game.id, token, now]).rowcount == 1
+            db.commit()
+            return owned, row['interval'], owned and row['owner'] not in (None, token)
+        finally:
+            db.close()
+
+    def since_last_call(self, db=None):
+        """Seconds since the game's last call, or None before the first"""
+        db = get_db(db)
+        row = db.execute('''SELECT (julianday('now') - julianday(called_at)) * 86400 AS elapsed
+                            FROM called_numbers WHERE game_id = ? ORDER BY id DESC LIMIT 1''',
+                         [self.game.id]).fetchone()
+        db.close()
+        return max(0, row['elapsed']) if row else None
+
+    def run(self, stop_event):
+        token = f'{os.getpid()}:{uuid.uuid4().hex}'
+        last_tick = None  # monotonic time the previous call was due
+        while not stop_event.is_set():
+            self.wakeup.clear()
+            try:
+                lease = self.acquire_lease(token)
+            except sqlite3.Error as e:
+                print(f"Auto-call lease error in game {self.game.id}: {e}")
+                lease = (False, AUTO_CALL_INTERVAL, False)
+            if lease is None:
+                break
+            owned, interval, taken_over = lease
+            now = time.monotonic()
+            if not owned:
+                last_tick = None
+                self.wakeup.wait(AUTO_CALL_POLL)
+                continue
+            if taken_over and last_tick is None:
+                # Keep the failed scheduler's rhythm: the next call is due an
+                # interval after its last one, not right away
+                elapsed = self.since_last_call()
+                if elapsed is not None:
+                    last_tick = now - elapsed
+            
+            due = now if last_tick is None else last_tick + interval
+            if now >= due:
+                number, message = call_number(game_id=self.game.id, auto_call_owner=token)
+                if number:
+                    print(f"Auto-called number {number} in game {self.game.id}")
+                else:
+                    print(f"Auto-call failed in game {self.game.id}: {message}")
+                    if "All numbers have been called" in message:
+                        self.stop()
+                        break
+                # Schedule from when the call was due, not when it finished;
+                # after a long stall start afresh instead of calling in a burst
+                last_tick = due if now - due < interval else now
+                due = last_tick + interval
+            self.wakeup.wait(max(0, min(due - time.monotonic(), AUTO_CALL_POLL)))
+
+def game_prefix(game_id):
+    """URL prefix of a game's pages; the default game also lives at the root"""
+    return '' if game_id == DEFAULT_GAME_ID else f'/g/{game_id}'
+
+class Game:
+    """Everything a process keeps in memory for one game"""
+
+    def __init__(self, game_id, name):
+        self.id = game_id
+        self.name = name
+        self.state = GameState(game_id)
+        self.winners = WinnerIndex(self.state)
+        self.events = EventBroker(game_id)
+        self.claims_lock = threading.Lock()
+        self.auto_caller = AutoCaller(self)
+
+    @property
+    def prefix(self):
+        return game_prefix(self.id)
+
+    @property
+    def etag(self):
+        """Entity tag of responses that only depend on the game version"""
+        return f'{self.id}-{self.state.version}'
+
+    def url(self, path):
+        return self.prefix + path
+
+    @property
+    def ticket_session_key(self):
+        """Session key remembering this device's ticket code in the game"""
+        return 'ticket_code' if self.id == DEFAULT_GAME_ID else f'ticket_code_{self.id}'
+
+# Games are loaded on first use and share the process: each costs a few
+# small objects plus its winner index, and nothing runs for it unless it
+# has subscribers or an auto-caller
+games = {}
+games_lock = threading.Lock()
+
+def get_game(game_id):
+    """The cached Game for game_id, or None if there is no such game"""
+    game = games.get(game_id)
+    if game is not None:
+        return game
+    with games_lock:
+        game = games.get(game_id)
+        if game is None:
+            db = get_db()
+            row = db.execute('SELECT id, name FROM games WHERE id = ?', [game_id]).fetchone()
+            db.close()
+            if row is None:
+                return None
+            game = Game(row['id'], row['name'])
+            game.state.load()
+            games[game_id] = game
+            threading.Thread(target=game.winners.build, daemon=True).start()
+            game.auto_caller.resume()
+    return game
+
+def create_game(name, db=None):
+    """Create a game and return its id"""
+    db = get_db(db)
+    try:
+        cursor = db.execute('INSERT INTO games (name) VALUES (?)', [name])
+        db.commit()
+        return cursor.lastrowid
+    finally:
+        db.close()
+
+def get_called_numbers(game_id=DEFAULT_GAME_ID):
+    """Get all called numbers of a game in order"""
+    game = get_game(game_id)
+    game.state.refresh()
+    return game.state.called_numbers()
+    
+def called_numbers_payload(game, since=None, encoding='list'):
+    """Body of /called_numbers.
+
+    Without since, every called number in call order. With the seq of an
+    earlier response, only the numbers called after it; reset means the
+    client's list is stale and numbers replaces it. encoding=bitmap sends
+    the set of called numbers as 90 bits in hex instead (bit n-1 for
+    number n), for clients joining mid-game.
+    """
+    if encoding == 'bitmap':
+        seq, called, _ = game.state.calls_since(0)
+        mask = 0
+        for number in called:
+            mask |= 1 << (number - 1)
+        return {'seq': seq, 'bitmap': format(mask, '023x'),
+                'last_number': called[-1] if called else None, 'total_called': len(called)}
+    if since is None:
+        called = game.state.snapshot()
+        return {'called_numbers': called, 'total_called': len(called)}
+    seq, numbers, reset = game.state.calls_since(since)
+    return {'seq': seq, 'numbers': numbers, 'reset': reset}
+
+@game_route('/called_numbers')
+@versioned
+def called_numbers_route(game):
+    """Called numbers of the game: all of them, or ?since=<seq> for the new ones only"""
+    since = request.args.get('since', type=int)
+    encoding = request.args.get('encoding', 'list')
+    if encoding not in ('list', 'bitmap') or (since is None and 'since' in request.args):
+        return jsonify({'error': 'Invalid since or encoding'}), 400
+    return jsonify(called_numbers_payload(game, since, encoding))
+
+def ticket_status(game, ticket_code, db=None):
+    """Pattern status of every ticket of the player owning ticket_code, or None"""
+    player = player_cache.get(ticket_code, db)
+    if player is None or player.game_id != game.id:
+        return None
+    called = game.state.snapshot()
+    patterns = check_tickets_patterns(player.tickets, numbers_mask(called))
+    return {
+        'ticket_code': ticket_code,
+        'total_called': len(called),
+        'tickets': [{'ticket_code': ticket.code, 'patterns': result}
+                    for ticket, result in zip(player.tickets, patterns)]
+    }
+
+@game_route('/ticket_status')
+def ticket_status_route(game):
+    """Which patterns a player's tickets have completed so far"""
+    game.state.refresh()
+    status = ticket_status(game, request.args.get('code', ''))
+    if status is None:
+        return jsonify({'error': 'Invalid ticket code'}), 404
+    return jsonify(status)
+
+@game_route('/dashboard')
+def number_dashboard(game):
     """Big screen number dashboard"""
-    called_numbers = get_called_numbers()
+    called_numbers = get_called_numbers(game.id)
     recent_numbers = called_numbers[-10:] if called_numbers else []
     
     # Get last called number
@@ -1061,22 +2982,22 @@ def number_dashboard():
                          total_called=len(called_numbers),
                          remaining=90 - len(called_numbers))
     
-@app.route('/call_number', methods=['POST'])
-def call_number_route():
+@game_route('/call_number', methods=['POST'])
+def call_number_route(game):
     """Call a number (manual or auto)"""
     try:
         number = request.form.get('number', type=int)
         auto = request.form.get('auto') == 'true'
         
         if auto:
-            number, message = call_number()  # Auto-call
+            number, message = call_number(game_id=game.id)  # Auto-call
         else:
             if number is None:
                 return jsonify({
                     'success': False,
                     'message': "Please provide a number"
                 })
-            number, message = call_number(number)  # Manual call
+            number, message = call_number(number, game.id)  # Manual call
         
         if number:
             number_text = get_number_text(number)
@@ -1086,7 +3007,7 @@ def call_number_route():
                 'number': number,
                 'number_text': number_text,
                 'message': message,
-                'total_called': len(get_called_numbers())
+                'total_called': game.state.total_called()
             })
         else:
             return jsonify({
@@ -1100,165 +3021,182 @@ def call_number_route():
             'message': f"Server error: {str(e)}"
         })
         
-def reset_called_numbers():
-    """Reset all called numbers"""
-    db = get_db()
-    db.execute('DELETE FROM called_numbers')
-    db.commit()
-    db.close()
+def reset_called_numbers(game_id=DEFAULT_GAME_ID):
+    """Reset all called numbers of a game"""
+    game = get_game(game_id)
+    with game.state.lock:
+        db = get_db()
+        db.execute('DELETE FROM called_numbers WHERE game_id = ?', [game.id])
+        db.execute('DELETE FROM events WHERE game_id = ?', [game.id])
+        version = bump_game_version(db, game.id)
+        record_event(db, game.id, 'reset', {})
+        db.commit()
+        db.close()
+        game.state.reset()
+        game.state.set_version(version)
+    game.events.sync(force=True)
     return True
 
-def get_number_text(number):
-    """Convert number to proper pronunciation like '2 3 twenty-three' for Tamil style"""
-    if not number:
-        return ""
-    
-    # For single digit numbers (1-9) - pronounce as single digit
-    if 1 <= number <= 9:
-        number_words = {
-            1: "One", 2: "Two", 3: "Three", 4: "Four", 5: "Five",
-            6: "Six", 7: "Seven", 8: "Eight", 9: "Nine"
-        }
-        return number_words.get(number, str(number))
-    
-    # For two-digit numbers (10-90)
-    elif 10 <= number <= 90:
-        # Special cases
-        if number == 10: return "Ten"
-        if number == 11: return "Eleven"
-        if number == 12: return "Twelve"
-        if number == 13: return "Thirteen"
-        if number == 14: return "Fourteen"
-        if number == 15: return "Fifteen"
-        if number == 16: return "Sixteen"
-        if number == 17: return "Seventeen"
-        if number == 18: return "Eighteen"
-        if number == 19: return "Nineteen"
-        if number == 20: return "Twenty"
-        if number == 30: return "Thirty"
-        if number == 40: return "Forty"
-        if number == 50: return "Fifty"
-        if number == 60: return "Sixty"
-        if number == 70: return "Seventy"
-        if number == 80: return "Eighty"
-        if number == 90: return "Ninety"
-        
-        # For numbers like 23, 45, etc. - combine tens and units
-        tens = (number // 10) * 10
-        units = number % 10
-        
-        tens_words = {
-            20: "Twenty", 30: "Thirty", 40: "Forty", 50: "Fifty",
-            60: "Sixty", 70: "Seventy", 80: "Eighty"
-        }
-        
-        units_words = {
-            1: "One", 2: "Two", 3: "Three", 4: "Four", 5: "Five",
-            6: "Six", 7: "Seven", 8: "Eight", 9: "Nine"
-        }
-        
-        if tens in tens_words and units in units_words:
-            return f"{tens_words[tens]}-{units_words[units]}"
-        else:
-            return str(number)
-    
-    return str(number)
-
-def auto_call_worker():
-    """Background worker for automatic number calling"""
-    while auto_call_enabled:
-        try:
-            if auto_call_enabled:
-                number, message = call_number()
-                if number:
-                    print(f"Auto-called number: {number}")
-                else:
-                    print(f"Auto-call failed: {message}")
-                    if "All numbers have been called" in message:
-                        stop_auto_call()
-            time.sleep(auto_call_interval)
-        except Exception as e:
-            print(f"Auto-call error: {e}")
-        time.sleep(auto_call_interval)
-
-auto_call_thread = None
-
-def start_auto_call():
-    """Start automatic number calling"""
-    global auto_call_enabled, auto_call_thread
-    if not auto_call_enabled:
-        auto_call_enabled = True
-        auto_call_thread = threading.Thread(target=auto_call_worker, daemon=True)
-        auto_call_thread.start()
-        return True, "Auto-call started!"
-    return False, "Auto-call is already running!"
+def start_auto_call(game_id=DEFAULT_GAME_ID):
+    """Start automatic number calling in a game"""
+    return get_game(game_id).auto_caller.start()
 
-def stop_auto_call():
-    """Stop automatic number calling"""
-    global auto_call_enabled
-    auto_call_enabled = False
-    return True, "Auto-call stopped!"
+def stop_auto_call(game_id=DEFAULT_GAME_ID):
+    """Stop automatic number calling in a game"""
+    return get_game(game_id).auto_caller.stop()
 
-def get_auto_call_status():
-    """Get auto-call status"""
-    return auto_call_enabled
+def get_auto_call_status(game_id=DEFAULT_GAME_ID):
+    """Get auto-call status of a game"""
+    return get_game(game_id).auto_caller.enabled
 
-@app.route('/auto_call/start')
-def start_auto_call_route():
+@game_route('/auto_call/start')
+def start_auto_call_route(game):
     """Start automatic number calling"""
-    success, message = start_auto_call()
+    success, message = start_auto_call(game.id)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/auto_call/stop')
-def stop_auto_call_route():
+@game_route('/auto_call/stop')
+def stop_auto_call_route(game):
     """Stop automatic number calling"""
-    success, message = stop_auto_call()
+    success, message = stop_auto_call(game.id)
     return jsonify({'success': success, 'message': message})
 
-@app.route('/auto_call/status')
-def auto_call_status_route():
+@game_route('/auto_call/status')
+def auto_call_status_route(game):
     """Get auto-call status"""
-    return jsonify({'enabled': auto_call_enabled})
+    row = game.auto_caller.settings()
+    return jsonify({'enabled': bool(row and row['enabled']),
+                    'interval': row['interval'] if row else AUTO_CALL_INTERVAL})
 
-@app.route('/auto_call/set_interval', methods=['POST'])
-def set_auto_call_interval():
+@game_route('/auto_call/set_interval', methods=['POST'])
+def set_auto_call_interval(game):
     """Set auto-call interval"""
-    global auto_call_interval
-    interval = request.json.get('interval', 10)
-    if 5 <= interval <= 60:  # Limit between 5 and 60 seconds
-        auto_call_interval = interval
-        return jsonify({'success': True, 'interval': auto_call_interval})
+    interval = request.json.get('interval', AUTO_CALL_INTERVAL)
+    if AUTO_CALL_MIN_INTERVAL <= interval <= AUTO_CALL_MAX_INTERVAL:
+        # Takes effect from the next call
+        game.auto_caller.set_interval(interval)
+        return jsonify({'success': True, 'interval': interval})
     return jsonify({'success': False, 'message': 'Interval must be between 5 and 60 seconds'})
 
+# /sound/* bodies depend only on the number and language, so they are
+# rendered once and served with a year-long immutable Cache-Control.
+SOUND_MAX_AGE = 365 * 24 * 3600
+SOUND_CACHE_CONTROL = f'public, max-age={SOUND_MAX_AGE}, immutable'
+
+# Clips pre-rendered by build_audio.py change with every build, so they are
+# only listed by /sound/voices, never inside the immutable bodies above
+AUDIO_MANIFEST = load_audio_manifest()
+
+def sound_payloads(number, language):
+    text = get_number_text(number, language)
+    call = HOUSIE_CALLS[number]
+    query = '' if language == 'en' else f'?lang={language}'
+    return {
+        'announce': {'number': number, 'text': text, 'call': call,
+                     'audio_url': f'/sound/speak/{number}{query}'},
+        'speak': {'number': number, 'text': text, 'call': call,
+                  'message': announcement_text(number, language)},
+    }
+
+# (kind, number, language) -> JSON body
+SOUND_RESPONSES = {
+    (kind, number, language): json.dumps(payload).encode()
+    for language in NUMBER_TEXTS
+    for number in ALL_TAMBOLA_NUMBERS
+    for kind, payload in sound_payloads(number, language).items()
+}
+
+def sound_response(kind, number):
+    language = request.args.get('lang', 'en')
+    body = SOUND_RESPONSES.get((kind, number, language))
+    if body is None:
+        return jsonify({'error': 'Unknown number or language'}), 404
+    response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = SOUND_CACHE_CONTROL
+    return response
+
 @app.route('/sound/announce/<int:number>')
 def announce_number(number):
     """Announce a number with sound (text-to-speech)"""
-    number_text = get_number_text(number)
-    return jsonify({
-        'number': number,
-        'text': number_text,
-        'audio_url': f'/sound/speak/{number}'
-    })
+    return sound_response('announce', number)
 
 @app.route('/sound/speak/<int:number>')
 def speak_number_route(number):
-    """Text-to-speech endpoint for numbers"""
-    number_text = get_number_text(number)
-    
-    # This is a placeholder - in production, you'd use a TTS service
-    # For now, we'll return a JSON response
-    return jsonify({
-        'number': number,
-        'text': number_text,
-        'message': f"Number {number} - {number_text}"
-    })
+    """Text-to-speech endpoint for numbers; /sound/voices lists the pre-rendered clips"""
+    return sound_response('speak', number)
+
+@app.route('/sound/voices')
+def sound_voices():
+    """Every pre-rendered clip by voice, for displays to prefetch at game start"""
+    response = jsonify({voice: {'language': entry['language'],
+                                'files': {number: f'/sound/audio/{path}' for number, path in entry['files'].items()}}
+                        for voice, entry in AUDIO_MANIFEST.items()})
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/sound/audio/<voice>/<filename>')
+def sound_audio(voice, filename):
+    """A pre-rendered clip; Range requests are answered with 206"""
+    response = send_from_directory(AUDIO_DIR, f'{voice}/{filename}', max_age=SOUND_MAX_AGE)
+    response.headers['Cache-Control'] = SOUND_CACHE_CONTROL
+    return response
+    
+@game_route('/events')
+def events_stream(game):
+    """Server-Sent Events feed of called numbers, approvals and resets"""
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id)
+    except (TypeError, ValueError):
+        last_id = None
+    
+    broker = game.events
+    broker.sync()
+    # New clients start from now; ids from an older database also start over
+    if last_id is None or last_id > broker.last_id:
+        last_id = broker.last_id
+    
+    def stream(last_id):
+        yield f'retry: {EVENT_RETRY_MS}\n\n'
+        deadline = time.monotonic() + EVENT_STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            events = broker.wait(last_id, EVENT_HEARTBEAT)
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event_id, event, data in events:
+                yield f'id: {event_id}\nevent: {event}\ndata: {data}\n\n'
+                last_id = event_id
     
+    return Response(stream(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/health')
 def health():
     return 'OK'
 
+@app.route('/games', methods=['GET', 'POST'])
+def games_route():
+    """List games, or create one from a JSON or form `name`"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        name = (data.get('name') or '').strip()
+        if not name:
+            return jsonify({'success': False, 'message': 'Please provide a game name'}), 400
+        game_id = create_game(name)
+        return jsonify({'success': True, 'id': game_id, 'name': name, 'url': game_prefix(game_id) + '/'})
+    
+    db = get_db()
+    rows = db.execute('SELECT id, name, created_at FROM games ORDER BY id ASC').fetchall()
+    db.close()
+    return jsonify([{'id': row['id'], 'name': row['name'], 'created_at': row['created_at'],
+                     'url': game_prefix(row['id']) + '/'} for row in rows])
+
 # Initialize database
 init_db()
+get_game(DEFAULT_GAME_ID)
+threading.Thread(target=prewarm_qr_codes, daemon=True).start()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 10000))
@@ -0,0 +1,261 @@
+"""ASGI entry point: `uvicorn asgi:application`.
+
+The hot read endpoints (/last_number, /called_numbers, /ticket_status,
+/sound/*) and the /events stream are answered on the event loop from
+memory, so an idle screen or phone costs a coroutine instead of a worker
+thread. Every other request goes to the Flask app on a thread pool.
+Serving 10k idle clients also needs `ulimit -n` above 10k.
+"""
+import asyncio
+import functools
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+import app as tambola
+
+WSGI_THREADS = 32  # threads running Flask requests, as gthread did before
+EVENT_PUMP_THREADS = 64  # games streaming at once before their pumps take turns
+
+flask_application = WSGIMiddleware(tambola.app, workers=WSGI_THREADS)
+# Pumps block for up to EVENT_HEARTBEAT, so they get their own threads
+# instead of starving the loop's default executor that asyncio.to_thread uses
+event_pumps = ThreadPoolExecutor(EVENT_PUMP_THREADS, thread_name_prefix='event-pump')
+
+HOT_ROUTE = re.compile(r'^(?:/g/(\d+))?/(last_number|called_numbers|ticket_status|events)$')
+SOUND_ROUTE = re.compile(r'^/sound/(announce|speak)/(\d+)$')
+
+refreshes = {}  # game id -> task reloading that game's state
+
+
+async def fresh_state(game):
+    """Pick up other workers' calls, at most once per GAME_STATE_SYNC_INTERVAL.
+
+    The DB check runs in a thread, and concurrent requests share one check.
+    """
+    if time.monotonic() - game.state.last_check < tambola.GAME_STATE_SYNC_INTERVAL:
+        return
+    task = refreshes.get(game.id)
+    if task is None or task.done():
+        task = refreshes[game.id] = asyncio.ensure_future(asyncio.to_thread(game.state.refresh))
+    await asyncio.shield(task)
+
+
+class EventHub:
+    """Relays one game's EventBroker to any number of async subscribers.
+
+    A single thread per game, from event_pumps, blocks on the broker; each
+    wake-up is broadcast to the coroutines waiting here.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.condition = asyncio.Condition()
+        self.last_id = game.events.last_id
+        self.subscribers = 0
+        self.task = None
+
+    def subscribe(self):
+        self.subscribers += 1
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.pump())
+
+    def unsubscribe(self):
+        self.subscribers -= 1
+
+    async def pump(self):
+        broker = self.game.events
+        loop = asyncio.get_running_loop()
+        while self.subscribers > 0:
+            events = await loop.run_in_executor(event_pumps, broker.wait, self.last_id, tambola.EVENT_HEARTBEAT)
+            if events:
+                async with self.condition:
+                    self.last_id = events[-1][0]
+                    self.condition.notify_all()
+
+    async def wait(self, last_id, timeout):
+        """Events newer than last_id, or [] once timeout expires"""
+        if self.last_id <= last_id:
+            async with self.condition:
+                try:
+                    await asyncio.wait_for(self.condition.wait_for(lambda: self.last_id > last_id), timeout)
+                except asyncio.TimeoutError:
+                    return []
+        broker = self.game.events
+        if last_id >= broker.floor_id:
+            return broker.events_since(last_id)  # from memory
+        return await asyncio.to_thread(broker.events_since, last_id)
+
+
+hubs = {}  # game id -> EventHub
+
+
+async def send_json(send, payload, status=200, headers=()):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode()), *headers]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def etag_matches(scope, etag):
+    """Whether the request's If-None-Match lists etag (weak comparison) or *"""
+    for name, value in scope['headers']:
+        if name == b'if-none-match':
+            tags = [tag.strip().removeprefix('W/').strip('"') for tag in value.decode('latin-1').split(',')]
+            return '*' in tags or etag in tags
+    return False
+
+
+def versioned(handler):
+    """Async twin of app.versioned: 304 from memory when the game version is unchanged"""
+    @functools.wraps(handler)
+    async def wrapper(game, scope, receive, send):
+        await fresh_state(game)
+        etag = game.etag
+        headers = ((b'etag', f'"{etag}"'.encode()), (b'cache-control', b'no-cache'))
+        if etag_matches(scope, etag):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': list(headers)})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await handler(game, scope, receive, lambda message: send(with_headers(message, headers)))
+    return wrapper
+
+
+def with_headers(message, headers):
+    if message['type'] == 'http.response.start':
+        message = {**message, 'headers': [*message['headers'], *headers]}
+    return message
+
+
+@versioned
+async def last_number(game, scope, receive, send):
+    called = game.state.snapshot()
+    if called:
+        await send_json(send, {'number': called[-1], 'number_text': tambola.get_number_text(called[-1])})
+    else:
+        await send_json(send, {'number': None})
+
+
+@versioned
+async def called_numbers(game, scope, receive, send):
+    query = parse_qs(scope['query_string'].decode())
+    encoding = query.get('encoding', ['list'])[0]
+    since = query.get('since', [None])[0]
+    try:
+        since = None if since is None else int(since)
+    except ValueError:
+        encoding = None
+    if encoding not in ('list', 'bitmap'):
+        await send_json(send, {'error': 'Invalid since or encoding'}, 400)
+        return
+    await send_json(send, tambola.called_numbers_payload(game, since, encoding))
+
+
+async def ticket_status(game, scope, receive, send):
+    await fresh_state(game)
+    code = parse_qs(scope['query_string'].decode()).get('code', [''])[0]
+    status = await asyncio.to_thread(tambola.ticket_status, game, code)
+    if status is None:
+        await send_json(send, {'error': 'Invalid ticket code'}, 404)
+    else:
+        await send_json(send, status)
+
+
+async def events(game, scope, receive, send):
+    """Async twin of the Flask /events stream"""
+    headers = dict(scope['headers'])
+    last_id = headers.get(b'last-event-id', b'').decode() or \
+        parse_qs(scope['query_string'].decode()).get('last_event_id', [''])[0]
+    try:
+        last_id = int(last_id)
+    except ValueError:
+        last_id = None
+
+    broker = game.events
+    await asyncio.to_thread(broker.sync)
+    # New clients start from now; ids from an older database also start over
+    if last_id is None or last_id > broker.last_id:
+        last_id = broker.last_id
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    hub = hubs.get(game.id)
+    if hub is None:
+        hub = hubs[game.id] = EventHub(game)
+    hub.subscribe()
+    try:
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream'),
+                                (b'cache-control', b'no-cache'),
+                                (b'x-accel-buffering', b'no')]})
+        await send({'type': 'http.response.body', 'body': f'retry: {tambola.EVENT_RETRY_MS}\n\n'.encode(),
+                    'more_body': True})
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + tambola.EVENT_STREAM_LIFETIME
+        while loop.time() < deadline and not disconnected.is_set():
+            batch = await hub.wait(last_id, tambola.EVENT_HEARTBEAT)
+            if disconnected.is_set():
+                break
+            if not batch:
+                chunk = ': keep-alive\n\n'
+            else:
+                chunk = ''.join(f'id: {event_id}\nevent: {event}\ndata: {data}\n\n'
+                                for event_id, event, data in batch)
+                last_id = batch[-1][0]
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        if not disconnected.is_set():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        hub.unsubscribe()
+        watcher.cancel()
+
+
+HOT_HANDLERS = {
+    'last_number': last_number,
+    'called_numbers': called_numbers,
+    'ticket_status': ticket_status,
+    'events': events,
+}
+
+
+async def sound(kind, number, scope, send):
+    """Prebuilt /sound/* bodies, answered without touching Flask"""
+    language = parse_qs(scope['query_string'].decode()).get('lang', ['en'])[0]
+    body = tambola.SOUND_RESPONSES.get((kind, number, language))
+    if body is None:
+        await send_json(send, {'error': 'Unknown number or language'}, 404)
+        return
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode()),
+                            (b'cache-control', tambola.SOUND_CACHE_CONTROL.encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        match = SOUND_ROUTE.match(scope['path'])
+        if match:
+            await sound(match.group(1), int(match.group(2)), scope, send)
+            return
+        match = HOT_ROUTE.match(scope['path'])
+        if match:
+            game_id = int(match.group(1) or tambola.DEFAULT_GAME_ID)
+            game = tambola.games.get(game_id) or await asyncio.to_thread(tambola.get_game, game_id)
+            if game is None:
+                await send_json(send, {'error': 'Game not found'}, 404)
+                return
+            await HOT_HANDLERS[match.group(2)](game, scope, receive, send)
+            return
+    await flask_application(scope, receive, send)
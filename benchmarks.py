@@ -0,0 +1,237 @@
+"""Micro-benchmarks for the game's hot paths.
+
+Run with `python benchmarks.py [name ...]` from anywhere; the app is
+imported inside a scratch directory so the real tambola.db is untouched.
+"""
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp(prefix='tambola-bench-'))
+
+import app  # noqa: E402
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - start
+
+
+def bench_ticket_generation(repeat=20000):
+    """Tickets per second from generate_tambola_ticket()"""
+    elapsed = timed(app.generate_tambola_ticket, repeat)
+    print(f"generate_tambola_ticket: {repeat / elapsed:,.0f} tickets/s "
+          f"({elapsed / repeat * 1e6:.1f} us/ticket)")
+
+
+def bench_strip_generation(repeat=3000):
+    """Full strips per second from generate_ticket_strip()"""
+    elapsed = timed(app.generate_ticket_strip, repeat)
+    print(f"generate_ticket_strip: {repeat / elapsed:,.0f} strips/s "
+          f"({repeat * app.STRIP_SIZE / elapsed:,.0f} tickets/s)")
+
+
+def register_players(count):
+    """Register `count` players, returning (test client, ticket_code) pairs"""
+    players = []
+    for i in range(count):
+        client = app.app.test_client()
+        client.post('/register', data={'name': f'Player {i}'})
+        with client.session_transaction() as session:
+            players.append((client, session['ticket_code']))
+    return players
+
+
+def asgi_get(application, path, headers=()):
+    """Coroutine running one GET through an ASGI app; returns (status, body bytes)"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+             'headers': [(name.lower().encode(), value.encode()) for name, value in headers]}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await application(scope, receive, send)
+        return messages[0]['status'], sum(len(m.get('body', b'')) for m in messages[1:])
+    return run()
+
+
+def bench_conditional_polls(repeat=5000):
+    """CPU and bytes per poll of /last_number and /called_numbers, full body vs 304"""
+    app.reset_called_numbers()
+    for _ in range(60):
+        app.call_number()
+    client = app.app.test_client()
+    try:
+        import asgi
+    except ImportError:
+        asgi = None
+
+    def report(kind, path, poll, etag):
+        status, size = poll(())
+        assert status == 200
+        status, cached_size = poll([('If-None-Match', etag)])
+        assert status == 304
+        def cpu(headers):
+            start = time.process_time()
+            for _ in range(repeat // 5):
+                poll(headers)
+            return (time.process_time() - start) / (repeat // 5)
+        # Best of alternating rounds, as the test harness itself is noisy
+        rounds = [(cpu(()), cpu([('If-None-Match', etag)])) for _ in range(5)]
+        full = min(full for full, _ in rounds)
+        cached = min(cached for _, cached in rounds)
+        print(f"{kind:5} {path}: 200 {full * 1e6:.0f} us/{size} B, 304 {cached * 1e6:.0f} us/{cached_size} B "
+              f"({(full - cached) * 1e6:.0f} us saved)")
+
+    def flask_poll(path):
+        def poll(headers):
+            response = client.get(path, headers=list(headers))
+            return response.status_code, len(response.data)
+        return poll
+
+    def asgi_poll(path, loop):
+        return lambda headers: loop.run_until_complete(asgi_get(asgi.application, path, headers))
+
+    loop = asyncio.new_event_loop()
+    for path in ('/last_number', '/called_numbers'):
+        etag = client.get(path).headers['ETag']
+        report('flask', path, flask_poll(path), etag)
+        if asgi is not None:
+            report('asgi', path, asgi_poll(path, loop), etag)
+    loop.close()
+
+
+def bench_called_number_deltas(repeat=20000):
+    """Payload size and CPU of a /called_numbers poll late in a game: full list vs since=<seq>"""
+    app.reset_called_numbers()
+    for _ in range(80):
+        app.call_number()
+    game = app.get_game(app.DEFAULT_GAME_ID)
+    seq = game.state.calls_since(0)[0]
+    app.call_number()
+    for label, since, encoding in (('full', None, 'list'), ('bitmap', None, 'bitmap'),
+                                   ('since', seq, 'list')):
+        size = len(json.dumps(app.called_numbers_payload(game, since, encoding)))
+        elapsed = timed(lambda: json.dumps(app.called_numbers_payload(game, since, encoding)), repeat)
+        print(f"{label:6} {size:4} B, {elapsed / repeat * 1e6:.1f} us/poll")
+
+
+def bench_export(players=5000):
+    """Size, time and peak memory of /admin/export's formats over a game of strip holders"""
+    game = app.get_game(app.create_game('export benchmark'))
+    db = app.get_db()
+    for i in range(players):
+        tickets = app.generate_ticket_strip()
+        user_id = db.execute(
+            'INSERT INTO users (game_id, name, device_id, ticket_code, ticket_data, numbers_count) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [game.id, f'Player {i}', f'device-{i}', f'E{i:05d}A', json.dumps(tickets[0]), 90]).lastrowid
+        db.executemany('INSERT INTO tickets (game_id, user_id, ticket_code, ticket_data, strip_position) '
+                       'VALUES (?, ?, ?, ?, ?)',
+                       [(game.id, user_id, f'E{i:05d}{chr(65 + position)}', json.dumps(ticket), position)
+                        for position, ticket in enumerate(tickets)])
+    db.commit()
+    until = db.execute('SELECT MAX(id) FROM users').fetchone()[0]
+    db.close()
+    def export(export_format, compress):
+        chunks = app.export_chunks(app.export_players(game.id, 0, until), export_format)
+        return sum(len(chunk) for chunk in (app.gzip_chunks(chunks) if compress else chunks))
+
+    def whole_list():
+        # What the export did before streaming: every record in one list and one string
+        return len(json.dumps([app.export_record(player, tickets)
+                               for player, tickets in app.export_players(game.id, 0, until)], indent=2))
+
+    def traced(fn):
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    runs = [('json list', whole_list)] + [
+        (export_format + (' gzip' if compress else ''), functools.partial(export, export_format, compress))
+        for export_format in app.EXPORT_FORMATS for compress in (False, True)]
+    for label, fn in runs:
+        start = time.perf_counter()
+        size = fn()
+        elapsed = time.perf_counter() - start
+        print(f"{label:11} {size / 1e6:6.1f} MB in {elapsed:5.2f}s, peak {traced(fn) / 1e6:6.1f} MB")
+
+
+def bench_ticket_storage(tickets=1000000, repeat=100000):
+    """Decode cost and database size of JSON text vs encode_ticket() BLOBs"""
+    sample = [ticket for _ in range(1000) for ticket in app.generate_ticket_strip()]
+    for label, encode, decode in (('json', json.dumps, json.loads),
+                                  ('blob', app.encode_ticket, app.decode_ticket)):
+        stored = [encode(ticket) for ticket in sample]
+        elapsed = timed(lambda: [decode(data) for data in stored[:1000]], repeat // 1000)
+        path = f'storage-{label}.db'
+        db = sqlite3.connect(path)
+        db.execute('''CREATE TABLE tickets
+                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       ticket_code TEXT UNIQUE NOT NULL,
+                       ticket_data BLOB NOT NULL)''')
+        db.executemany('INSERT INTO tickets (ticket_code, ticket_data) VALUES (?, ?)',
+                       ((f'{i:06X}', stored[i % len(stored)]) for i in range(tickets)))
+        db.commit()
+        db.close()
+        print(f"{label}: {sum(map(len, stored)) / len(stored):5.1f} B/ticket, "
+              f"decode {elapsed / repeat * 1e6:.2f} us, "
+              f"{tickets:,} tickets in {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+def bench_player_cache(players=200, repeat=20000):
+    """Player lookup and pattern check per /ticket_status: database and parsing vs PlayerCache"""
+    codes = [code for _, code in register_players(players)]
+    game = app.get_game(app.DEFAULT_GAME_ID)
+    called_mask = game.state.called_mask
+    app.player_cache.clear()
+    for label, lookup in (('uncached', app.load_player), ('cached', app.player_cache.get)):
+        elapsed = timed(lambda: [app.check_tickets_patterns(lookup(code).tickets, called_mask)
+                                 for code in codes], repeat // players)
+        print(f"{label:8} {elapsed / repeat * 1e6:.1f} us/lookup")
+    print(f"cache: {app.player_cache.hits:,} hits, {app.player_cache.misses:,} misses")
+
+
+def bench_qr_codes(repeat=200):
+    """Cost of the landing page's QR code: rendering per hit vs QRCache"""
+    url = 'http://localhost/register'
+    elapsed = timed(lambda: app.render_qr(url), repeat)
+    print(f"render  {elapsed / repeat * 1e6:8.1f} us/code")
+    app.qr_cache.get(url)
+    elapsed = timed(lambda: app.qr_cache.get(url), repeat * 100)
+    print(f"cached  {elapsed / (repeat * 100) * 1e6:8.1f} us/code")
+    client = app.app.test_client()
+    elapsed = timed(lambda: client.get('/'), repeat)
+    print(f"index   {elapsed / repeat * 1e6:8.1f} us/page, {len(client.get('/').data):,} B")
+
+
+BENCHMARKS = {
+    'tickets': bench_ticket_generation,
+    'strips': bench_strip_generation,
+    'polls': bench_conditional_polls,
+    'deltas': bench_called_number_deltas,
+    'export': bench_export,
+    'storage': bench_ticket_storage,
+    'players': bench_player_cache,
+    'qr': bench_qr_codes,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,73 @@
+"""Pre-render the spoken announcement of every number into static/audio.
+
+Run with `python build_audio.py [voice ...]` as a build step. It needs
+espeak-ng (offline, no network); when ffmpeg is also installed the clips
+are compressed to 32 kbit/s mono MP3, otherwise they stay WAV. Files are
+named after a hash of their content, so the server can mark them
+immutable, and static/audio/manifest.json lists them for the app.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import announcements
+
+AUDIO_DIR = announcements.AUDIO_DIR
+
+# voice name -> (language of its text, espeak-ng voice)
+AUDIO_VOICES = {
+    'en-gb': ('en', 'en-gb'),
+    'en-us': ('en', 'en-us'),
+    'hi': ('hi', 'hi'),
+}
+SPEECH_RATE = 140  # words per minute; the browsers' 0.8 speech rate
+
+
+def render(text, espeak_voice, workdir):
+    """Audio bytes and file extension for text"""
+    wav = os.path.join(workdir, 'clip.wav')
+    subprocess.run(['espeak-ng', '-v', espeak_voice, '-s', str(SPEECH_RATE), '-w', wav, text], check=True)
+    if shutil.which('ffmpeg') is None:
+        with open(wav, 'rb') as f:
+            return f.read(), 'wav'
+    mp3 = os.path.join(workdir, 'clip.mp3')
+    subprocess.run(['ffmpeg', '-loglevel', 'error', '-y', '-i', wav, '-ac', '1', '-ar', '22050',
+                    '-b:a', '32k', mp3], check=True)
+    with open(mp3, 'rb') as f:
+        return f.read(), 'mp3'
+
+
+def build(voices):
+    manifest = announcements.load_audio_manifest()  # voices not rebuilt stay as they are
+    with tempfile.TemporaryDirectory() as workdir:
+        for voice in voices:
+            language, espeak_voice = AUDIO_VOICES[voice]
+            voice_dir = os.path.join(AUDIO_DIR, voice)
+            shutil.rmtree(voice_dir, ignore_errors=True)
+            os.makedirs(voice_dir)
+            files = {}
+            for number in announcements.NUMBERS:
+                data, ext = render(announcements.announcement_text(number, language), espeak_voice, workdir)
+                name = f'{number}-{hashlib.sha256(data).hexdigest()[:12]}.{ext}'
+                with open(os.path.join(voice_dir, name), 'wb') as f:
+                    f.write(data)
+                files[number] = f'{voice}/{name}'
+            manifest[voice] = {'language': language, 'files': files}
+            size = sum(os.path.getsize(os.path.join(voice_dir, name)) for name in os.listdir(voice_dir))
+            print(f"{voice}: {len(files)} clips, {size / 1024:.0f} KiB")
+    with open(os.path.join(AUDIO_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+
+if __name__ == '__main__':
+    if shutil.which('espeak-ng') is None:
+        sys.exit("build_audio.py needs espeak-ng (e.g. apt install espeak-ng)")
+    voices = sys.argv[1:] or list(AUDIO_VOICES)
+    unknown = set(voices) - set(AUDIO_VOICES)
+    if unknown:
+        sys.exit(f"Unknown voices: {', '.join(sorted(unknown))}")
+    build(voices)
@@ -0,0 +1,98 @@
+// Live game updates from /events (Server-Sent Events); pages of other
+// games than the default set window.GAME_PREFIX to their /g/<id> prefix.
+// Polling is only used while the stream is unavailable.
+function subscribeGameEvents(handlers, poll, pollInterval) {
+    let pollTimer = null;
+    let fallbackTimer = null;
+
+    function startPolling() {
+        if (pollTimer || !poll) return;
+        poll();
+        pollTimer = setInterval(poll, pollInterval || 3000);
+    }
+
+    function stopPolling() {
+        if (fallbackTimer) {
+            clearTimeout(fallbackTimer);
+            fallbackTimer = null;
+        }
+        if (pollTimer) {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+    }
+
+    if (!window.EventSource) {
+        startPolling();
+        return null;
+    }
+
+    const source = new EventSource((window.GAME_PREFIX || '') + '/events');
+
+    Object.keys(handlers).forEach(name => {
+        source.addEventListener(name, e => handlers[name](JSON.parse(e.data), e));
+    });
+
+    source.onopen = stopPolling;
+
+    source.onerror = () => {
+        // The browser reconnects on its own and replays missed events via
+        // Last-Event-ID; only poll if the stream stays down.
+        if (source.readyState === EventSource.CLOSED) {
+            startPolling();
+        } else if (!fallbackTimer && !pollTimer) {
+            fallbackTimer = setTimeout(() => {
+                fallbackTimer = null;
+                if (source.readyState !== EventSource.OPEN) startPolling();
+            }, 10000);
+        }
+    };
+
+    return source;
+}
+
+// Called numbers kept in step through /called_numbers?since=<seq>: after the
+// first fetch each poll only transfers the numbers called since the last one.
+// Resolves like a full /called_numbers response.
+function calledNumbersFeed() {
+    let seq = 0;
+    let numbers = [];
+    return function update() {
+        return fetch(`${window.GAME_PREFIX || ''}/called_numbers?since=${seq}`)
+            .then(response => response.json())
+            .then(data => {
+                numbers = data.reset ? data.numbers : numbers.concat(data.numbers);
+                seq = data.seq;
+                return {called_numbers: numbers.slice(), total_called: numbers.length};
+            });
+    };
+}
+
+// Announcements pre-rendered by build_audio.py, fetched up front so that
+// every screen plays a call as soon as its event arrives.
+const announcementClips = {};
+
+function preloadAnnouncements(language) {
+    return fetch('/sound/voices')
+        .then(response => response.json())
+        .then(voices => {
+            const voice = Object.values(voices).find(v => v.language === (language || 'en'));
+            if (!voice) return;
+            Object.entries(voice.files).forEach(([number, url]) => {
+                const clip = new Audio(url);
+                clip.preload = 'auto';
+                announcementClips[number] = clip;
+            });
+        })
+        .catch(error => console.error('Error loading announcements:', error));
+}
+
+// Plays the pre-rendered call of a number; false when there is none, so
+// callers can fall back to speech synthesis.
+function playAnnouncement(number) {
+    const clip = announcementClips[number];
+    if (!clip) return false;
+    clip.currentTime = 0;
+    clip.play().catch(error => console.error('Error playing announcement:', error));
+    return true;
+}
@@ -0,0 +1,50 @@
+"""Shared fixtures. The app is imported inside a scratch directory, so its
+database is a throwaway tambola.db; each test gets a game of its own."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix='tambola-test-'))
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def game():
+    """A new game with no players or calls"""
+    return app.get_game(app.create_game('test'))
+
+
+@pytest.fixture
+def register_player(game):
+    """register_player(name, strip=False) -> (test client, first ticket code)"""
+    def register(name, strip=False):
+        client = app.app.test_client()
+        data = {'name': name, 'tickets': 'strip'} if strip else {'name': name}
+        client.post(game.url('/register'), data=data)
+        with client.session_transaction() as session:
+            return client, session[game.ticket_session_key]
+    return register
+
+
+@pytest.fixture
+def traced_sql():
+    """Every statement run on the app's pooled connections, parameters filled in"""
+    statements = []
+    connect = app.db_pool.connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    app.db_pool.connect = traced_connect
+    for conn in app.db_pool.idle:
+        conn.set_trace_callback(statements.append)
+    yield statements
+    app.db_pool.connect = connect
+    for conn in app.db_pool.idle:
+        conn.set_trace_callback(None)
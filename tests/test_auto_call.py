@@ -0,0 +1,54 @@
+import time
+
+import app
+
+
+def set_lease(game, owner, lease_until, interval=app.AUTO_CALL_INTERVAL):
+    db = app.get_db()
+    db.execute('''INSERT INTO auto_call (game_id, enabled, interval, owner, lease_until) VALUES (?, 1, ?, ?, ?)
+                  ON CONFLICT(game_id) DO UPDATE SET enabled = 1, interval = excluded.interval,
+                  owner = excluded.owner, lease_until = excluded.lease_until''',
+               [game.id, interval, owner, lease_until])
+    db.commit()
+    db.close()
+
+
+def writes(statements):
+    return [statement for statement in statements if statement.lstrip().upper().startswith('UPDATE')]
+
+
+def test_only_the_lease_holder_writes(game, traced_sql):
+    set_lease(game, 'other', time.time() + app.AUTO_CALL_LEASE)
+    assert game.auto_caller.acquire_lease('standby') == (False, app.AUTO_CALL_INTERVAL, False)
+    assert not writes(traced_sql)
+
+    set_lease(game, 'other', time.time() - 1)
+    assert game.auto_caller.acquire_lease('standby') == (True, app.AUTO_CALL_INTERVAL, True)
+    del traced_sql[:]
+    # A fresh lease is not renewed until half of it has run out
+    assert game.auto_caller.acquire_lease('standby') == (True, app.AUTO_CALL_INTERVAL, False)
+    assert not writes(traced_sql)
+    assert game.auto_caller.settings()['owner'] == 'standby'
+
+
+def test_takeover_waits_out_the_interval(game):
+    app.call_number(game_id=game.id)
+    set_lease(game, 'gone', 0, interval=app.AUTO_CALL_MIN_INTERVAL)
+    game.auto_caller.run_thread()
+    try:
+        time.sleep(1.5)
+        assert game.state.total_called() == 1
+        assert game.auto_caller.settings()['owner'] != 'gone'
+    finally:
+        game.auto_caller.stop()
+
+
+def test_start_calls_right_away(game):
+    game.auto_caller.start()
+    try:
+        deadline = time.monotonic() + 2
+        while not game.state.total_called() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert game.state.total_called() == 1
+    finally:
+        game.auto_caller.stop()
@@ -0,0 +1,184 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+
+PRIZES = ['early_five', 'first_line', 'middle_line', 'bottom_line', 'full_house']
+
+
+def add_player(game, name, ticket, ticket_data=None):
+    """Register a player holding a given ticket; returns (user id, ticket code)"""
+    if ticket_data is None:
+        ticket_data = app.encode_ticket(ticket)
+    db = app.get_db()
+    code = app.generate_ticket_code(db)
+    user_id = db.execute(
+        'INSERT INTO users (game_id, name, device_id, ticket_code, ticket_data, numbers_count) VALUES (?, ?, ?, ?, ?, ?)',
+        [game.id, name, str(uuid.uuid4()), code, ticket_data, app.count_ticket_numbers(ticket)]
+    ).lastrowid
+    db.execute('INSERT INTO tickets (game_id, user_id, ticket_code, ticket_data) VALUES (?, ?, ?, ?)',
+               [game.id, user_id, code, ticket_data])
+    db.commit()
+    db.close()
+    return user_id, code
+
+
+def call(game, numbers):
+    for number in numbers:
+        if not game.state.is_called(number):
+            app.call_number(number, game_id=game.id)
+
+
+def row(ticket, index):
+    return [number for number in ticket[index] if number]
+
+
+def claim(player, name, prize):
+    success, message = app.claim_prize(player[0], player[1], prize, name)
+    assert success, message
+
+
+def claims(game):
+    db = app.get_db()
+    rows = db.execute('SELECT ticket_code, prize_type, status, approved_by, review_reason, completed_call, claimed_call '
+                      'FROM prizes WHERE game_id = ?', [game.id]).fetchall()
+    db.close()
+    return {(row['ticket_code'], row['prize_type']): dict(row) for row in rows}
+
+
+@pytest.fixture
+def two_tickets():
+    """Two tickets whose first rows differ, so first lines complete apart"""
+    while True:
+        first, second = app.generate_tambola_ticket(), app.generate_tambola_ticket()
+        if not set(row(second, 0)) <= set(row(first, 0)):
+            return first, second
+
+
+def test_first_completer_on_time_wins(game, two_tickets):
+    first, second = two_tickets
+    alice, bob = add_player(game, 'Alice', first), add_player(game, 'Bob', second)
+    call(game, row(first, 0))
+    claim(alice, 'Alice', 'first_line')
+    call(game, row(second, 0))
+    claim(bob, 'Bob', 'first_line')
+
+    assert app.process_pending_claims('first_line', game_id=game.id) == 2
+    result = claims(game)
+    assert result[(alice[1], 'first_line')]['status'] == 'approved'
+    assert result[(alice[1], 'first_line')]['approved_by'] == 'auto'
+    assert result[(bob[1], 'first_line')]['status'] == 'rejected'
+
+
+def test_late_claim_goes_to_review(game, two_tickets):
+    first, second = two_tickets
+    alice = add_player(game, 'Alice', first)
+    call(game, row(first, 0))
+    call(game, [number for number in app.ALL_TAMBOLA_NUMBERS if not game.state.is_called(number)][:1])
+    claim(alice, 'Alice', 'first_line')
+
+    assert app.process_pending_claims('first_line', game_id=game.id) == 0
+    result = claims(game)[(alice[1], 'first_line')]
+    assert result['status'] == 'pending'
+    assert result['review_reason'] == 'claimed late'
+    assert result['claimed_call'] == result['completed_call'] + 1
+
+
+@pytest.mark.parametrize('earlier_claims_late', [False, True])
+def test_earlier_completion_elsewhere_goes_to_review(game, two_tickets, earlier_claims_late):
+    first, second = two_tickets
+    alice = add_player(game, 'Alice', first)
+    bob = add_player(game, 'Bob', second)
+    call(game, row(first, 0))
+    call(game, row(second, 0))
+    claim(bob, 'Bob', 'first_line')
+    if earlier_claims_late:
+        claim(alice, 'Alice', 'first_line')
+
+    assert app.process_pending_claims('first_line', game_id=game.id) == 0
+    result = claims(game)
+    assert result[(bob[1], 'first_line')]['review_reason'] == 'another ticket completed this pattern earlier'
+    if earlier_claims_late:
+        assert result[(alice[1], 'first_line')]['review_reason'] == 'claimed late'
+
+
+def test_tie_goes_to_review(game):
+    # Two tickets sharing a number, each with four numbers of its own
+    while True:
+        first, second = app.generate_tambola_ticket(), app.generate_tambola_ticket()
+        shared = set(row(first, 0) + row(first, 1) + row(first, 2)) & set(row(second, 0) + row(second, 1) + row(second, 2))
+        if shared:
+            break
+    only_first = [number for index in range(3) for number in row(first, index) if number not in shared][:4]
+    only_second = [number for index in range(3) for number in row(second, index) if number not in shared][:4]
+    alice, bob = add_player(game, 'Alice', first), add_player(game, 'Bob', second)
+    call(game, only_first + only_second + [min(shared)])
+    claim(alice, 'Alice', 'early_five')
+    claim(bob, 'Bob', 'early_five')
+
+    assert app.process_pending_claims('early_five', game_id=game.id) == 0
+    result = claims(game)
+    assert result[(alice[1], 'early_five')]['review_reason'] == 'tie'
+    assert result[(bob[1], 'early_five')]['review_reason'] == 'tie'
+
+
+def test_incomplete_pattern_is_not_approved(game, two_tickets):
+    first, _ = two_tickets
+    alice = add_player(game, 'Alice', first)
+    call(game, row(first, 0)[:4])
+    claim(alice, 'Alice', 'first_line')
+
+    assert app.process_pending_claims('first_line', game_id=game.id) == 0
+    assert claims(game)[(alice[1], 'first_line')]['review_reason'] == 'pattern not complete'
+
+
+def test_legacy_ticket_with_six_number_row(game):
+    # Older generators could put six numbers in a row; such tickets stay JSON
+    legacy = [[1, 12, 23, 34, 45, 56, 0, 0, 0],
+              [0, 0, 0, 0, 0, 0, 67, 78, 89],
+              [2, 0, 24, 0, 46, 0, 68, 0, 90]]
+    alice = add_player(game, 'Alice', legacy, json.dumps(legacy))
+    assert app.Ticket.load(json.dumps(legacy)).data == json.dumps(legacy)
+
+    client = app.app.test_client()
+    assert client.get(game.url(f'/ticket?code={alice[1]}')).status_code == 200
+    assert client.get(game.url(f'/ticket_status?code={alice[1]}')).status_code == 200
+    call(game, row(legacy, 0))
+    claim(alice, 'Alice', 'first_line')
+
+    assert app.process_pending_claims('first_line', game_id=game.id) == 1
+    assert claims(game)[(alice[1], 'first_line')]['status'] == 'approved'
+
+
+def test_concurrent_claims_and_approvals_have_one_winner(game, register_player):
+    players = [register_player(f'Player {i}') for i in range(20)]
+    while app.call_number(game_id=game.id)[0]:
+        pass
+
+    def post_claim(args):
+        client, code, prize = args
+        client.post(game.url('/claim_prize'), data={'ticket_code': code, 'prize_type': prize})
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(post_claim, [(client, code, prize) for client, code in players
+                                   for prize in PRIZES for _ in range(2)]))
+
+    db = app.get_db()
+    pending = [row['id'] for row in db.execute(
+        "SELECT id FROM prizes WHERE game_id = ? AND status = 'pending'", [game.id])]
+    admin = app.app.test_client()
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda claim_id: admin.get(game.url(f'/admin/approve_claim/{claim_id}')), pending))
+
+    winners = {row['prize_type']: row['count'] for row in db.execute(
+        "SELECT prize_type, COUNT(*) AS count FROM prizes WHERE game_id = ? AND status = 'approved' "
+        "GROUP BY prize_type", [game.id])}
+    duplicates = db.execute(
+        "SELECT COUNT(*) FROM (SELECT 1 FROM prizes WHERE game_id = ? AND status IN ('pending', 'approved') "
+        "GROUP BY user_id, prize_type HAVING COUNT(*) > 1)", [game.id]).fetchone()[0]
+    db.close()
+    assert winners == {prize: 1 for prize in PRIZES}
+    assert duplicates == 0
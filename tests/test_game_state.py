@@ -0,0 +1,116 @@
+import sys
+import threading
+import time
+
+import app
+
+
+def test_calls_since(game):
+    seq, called, reset = game.state.calls_since(0)
+    assert (seq, called, reset) == (0, [], False)
+
+    first = [app.call_number(game_id=game.id)[0] for _ in range(5)]
+    seq, called, reset = game.state.calls_since(0)
+    assert called == first and reset
+
+    more = [app.call_number(game_id=game.id)[0] for _ in range(3)]
+    next_seq, called, reset = game.state.calls_since(seq)
+    assert called == more and not reset
+    assert game.state.calls_since(next_seq) == (next_seq, [], False)
+
+    app.reset_called_numbers(game.id)
+    after_reset = [app.call_number(game_id=game.id)[0] for _ in range(2)]
+    _, called, reset = game.state.calls_since(next_seq)
+    assert called == after_reset and reset
+
+
+def test_load_never_shows_readers_a_partial_sequence(game):
+    for _ in range(90):
+        app.call_number(game_id=game.id)
+    called = game.state.snapshot()
+    stop = threading.Event()
+    loads = []
+
+    def reload():
+        while not stop.is_set():
+            game.state.load()
+            loads.append(1)
+
+    loader = threading.Thread(target=reload)
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    loader.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(loads) < 200 and time.monotonic() < deadline:
+            assert game.state.snapshot() == called
+            assert game.state.calls_since(0)[1] == called
+    finally:
+        stop.set()
+        loader.join()
+        sys.setswitchinterval(switch_interval)
+
+
+def test_called_numbers_payload(game):
+    called = [app.call_number(game_id=game.id)[0] for _ in range(4)]
+    payload = app.called_numbers_payload(game, encoding='bitmap')
+    mask = int(payload['bitmap'], 16)
+    assert sorted(n for n in range(1, 91) if mask >> (n - 1) & 1) == sorted(called)
+    assert payload['last_number'] == called[-1]
+
+
+def test_winner_index_matches_pattern_check(game, register_player):
+    codes = [register_player(f'Player {i}', strip=True)[1] for i in range(3)]
+    tickets = [ticket for code in codes for ticket in app.player_cache.get(code).tickets]
+    for _ in range(45):
+        app.call_number(game_id=game.id)
+    # A late registration counts the numbers called before it, but cannot
+    # have completed anything before it joined
+    late = app.player_cache.get(register_player('Late')[1]).tickets
+    tickets += late
+    for _ in range(45):
+        app.call_number(game_id=game.id)
+    full_sequence = game.state.snapshot()
+
+    game.winners.sync()
+    completed_at = dict(game.winners.completed_at)
+    for ticket in tickets:
+        for pattern in app.PATTERNS:
+            expected = None
+            for index in range(1, len(full_sequence) + 1):
+                if app.check_ticket_patterns(ticket, full_sequence[:index])[pattern]:
+                    expected = max(index, 45) if ticket in late else index
+                    break
+            assert completed_at.get((ticket.code, pattern)) == expected, (ticket.code, pattern)
+
+    first_call, first_codes = game.winners.first_completion['full_house']
+    assert first_codes == {code for (code, pattern), call in completed_at.items()
+                           if pattern == 'full_house' and call == first_call}
+
+
+def test_winner_index_starts_over_after_reset(game, register_player):
+    register_player('Player')
+    for _ in range(90):
+        app.call_number(game_id=game.id)
+    game.winners.sync()
+    assert game.winners.first_completion
+    indexed = list(game.winners.codes)
+    app.reset_called_numbers(game.id)
+    assert game.winners.sync() == []
+    assert not game.winners.completed_at
+    for _ in range(90):
+        app.call_number(game_id=game.id)
+    game.winners.sync()
+    assert game.winners.codes == indexed
+    assert set(game.winners.first_completion) == set(app.PATTERNS)
+
+
+def test_winner_index_is_built_when_the_game_loads(game, register_player):
+    deadline = time.monotonic() + 5
+    while not game.winners.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert game.winners.ready
+    code = register_player('Player')[1]
+    app.call_number(game_id=game.id)
+    assert game.winners.codes == [code]
+    assert game.winners.applied == game.state.snapshot()
@@ -0,0 +1,18 @@
+import app
+
+
+def test_cached_player_matches_database(game, register_player):
+    code = register_player('Player', strip=True)[1]
+    player = app.player_cache.get(code)
+    assert player is app.player_cache.get(code)
+    assert player.name == 'Player' and len(player.tickets) == app.STRIP_SIZE
+    assert app.player_cache.get(player.tickets[-1].code).id == player.id
+
+
+def test_reset_in_another_worker_drops_cached_players(game, register_player, monkeypatch):
+    code = register_player('Player')[1]
+    assert app.player_cache.get(code) is not None
+    # As if another worker served /admin/reset-db: this process's cache is not cleared
+    monkeypatch.setattr(app.player_cache, 'clear', lambda: None)
+    app.reset_database()
+    assert app.player_cache.get(code) is None
@@ -0,0 +1,74 @@
+"""EXPLAIN QUERY PLAN over the queries app.py actually runs.
+
+The statements are captured from the app while it serves a game, so the
+check follows the code instead of a copy of its SQL.
+"""
+import re
+
+import app
+
+# One row per game or less; scanning these is fine
+SMALL_TABLES = {'games', 'auto_call', 'sqlite_master'}
+# Sorts that only ever see one player's rows (a claim or two per prize)
+PER_PLAYER_SORTS = ('SELECT prize_type, status, claimed_at FROM prizes WHERE user_id = ',)
+
+
+def play_a_game(game, register_player):
+    players = [register_player(f'Player {i}', strip=i % 2 == 0) for i in range(6)]
+    client, code = players[0]
+    for _ in range(30):
+        app.call_number(game_id=game.id)
+    for player_client, player_code in players:
+        for prize in ('early_five', 'first_line'):
+            player_client.post(game.url('/claim_prize'), data={'ticket_code': player_code, 'prize_type': prize})
+    admin = app.app.test_client()
+    admin.get(game.url('/admin'))
+    admin.get(game.url('/admin/process_claims'))
+    admin.get(game.url('/admin/api/users?limit=2'))
+    next_cursor = admin.get(game.url('/admin/api/users?limit=2')).get_json()['next_cursor']
+    admin.get(game.url(f'/admin/api/users?limit=2&cursor={next_cursor}'))
+    admin.get(game.url('/admin/api/users?q=Player'))
+    admin.get(game.url(f'/admin/api/users?q={code}'))
+    claims = admin.get(game.url('/admin/api/claims?limit=1')).get_json()
+    admin.get(game.url(f"/admin/api/claims?limit=1&cursor={claims['next_cursor']}"))
+    admin.get(game.url('/admin/api/claims?status=approved'))
+    if claims['claims']:
+        admin.get(game.url(f"/admin/api/users/{claims['claims'][0]['user_id']}/tickets"))
+        admin.get(game.url(f"/admin/approve_claim/{claims['claims'][0]['id']}"))
+    for export_format in app.EXPORT_FORMATS:
+        b''.join(admin.get(game.url(f'/admin/export?format={export_format}')).response)
+    admin.get(game.url('/admin/winners'))
+    admin.get(game.url('/stats'))
+    client.get(game.url('/ticket'))
+    client.get(game.url(f'/ticket_status?code={code}'))
+    client.get(game.url('/called_numbers'))
+    game.events.events_since(0)
+
+
+def full_scans(statement, plan):
+    """Steps that read a whole table or sort the result in a temporary b-tree"""
+    bad = []
+    for step in plan:
+        scan = re.match(r'SCAN (\w+)$', step)
+        if scan and scan.group(1) not in SMALL_TABLES:
+            bad.append(step)
+        elif step.startswith('USE TEMP B-TREE FOR') and not statement.startswith(PER_PLAYER_SORTS):
+            bad.append(step)
+    return bad
+
+
+def test_hot_queries_use_indexes(game, register_player, traced_sql):
+    play_a_game(game, register_player)
+    statements = {statement for statement in traced_sql
+                  if re.match(r'\s*(SELECT|UPDATE|DELETE)\b', statement, re.IGNORECASE)}
+    assert statements
+
+    db = app.get_db()
+    failures = {}
+    for statement in statements:
+        plan = [row['detail'] for row in db.execute('EXPLAIN QUERY PLAN ' + statement)]
+        bad = full_scans(statement, plan)
+        if bad:
+            failures[' '.join(statement.split())] = bad
+    db.close()
+    assert not failures
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import app
+
+
+def numbers(ticket):
+    return [number for row in ticket for number in row if number]
+
+
+@pytest.mark.parametrize('attempt', range(200))
+def test_strip_covers_every_number_once(attempt):
+    strip = app.generate_ticket_strip()
+    assert len(strip) == app.STRIP_SIZE
+    assert sorted(number for ticket in strip for number in numbers(ticket)) == app.ALL_TAMBOLA_NUMBERS
+    for ticket in strip:
+        assert app.validate_ticket(ticket).valid
+
+
+def test_single_tickets_are_valid():
+    for _ in range(200):
+        assert app.validate_ticket(app.generate_tambola_ticket()).valid
+
+
+def test_validate_ticket_reports_errors():
+    ticket = app.generate_tambola_ticket()
+    ticket[0] = [0] * 9
+    result = app.validate_ticket(ticket)
+    assert not result.valid
+    assert result.total == 10
+
+
+def test_encode_decode_round_trip():
+    for ticket in app.generate_ticket_strip():
+        data = app.encode_ticket(ticket)
+        assert len(data) == app.TICKET_BYTES
+        assert app.decode_ticket(data) == ticket
+        assert app.load_ticket(data) == ticket
+        assert app.load_ticket(json.dumps(ticket)) == ticket
+
+
+def test_encode_rejects_overfull_rows():
+    with pytest.raises(ValueError):
+        app.encode_ticket([[1, 10, 20, 30, 40, 50, 0, 0, 0], [0] * 9, [0] * 9])
+
+
+def test_ticket_object_matches_grid():
+    grid = app.generate_tambola_ticket()
+    ticket = app.Ticket(grid, 'ABC123')
+    assert [list(row) for row in ticket] == grid
+    assert ticket.data == app.encode_ticket(grid)
+    assert ticket.fingerprint == app.ticket_fingerprint(grid) == app.ticket_fingerprint(ticket)
+    assert ticket.count == app.count_ticket_numbers(grid) == 15
+    assert app.Ticket.load(ticket.data, 'ABC123') == ticket
+    called = numbers(grid)[:7] + [n for n in range(1, 91) if n not in numbers(grid)][:20]
+    assert ticket.patterns(called) == app.check_ticket_patterns(grid, called)